@@ -29,7 +29,7 @@ def custom_auth(url):
 
         def on_loaded():
             result[0] = window.get_current_url()
-            if 'void/callback' in result[0].split('?')[0]:
+            if 'void/callback' in result[0].partition('?')[0]:
                 window.destroy()
         try:
             window.events.loaded += on_loaded
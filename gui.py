@@ -2,35 +2,85 @@
 
 # Author: Tim Dorssers
 
-import ssl
+import os
 import time
+import sqlite3
 import logging
 import threading
 import webbrowser
 import multiprocessing
-import geopy.geocoders  # 1.14.0 or higher required
-from geopy.geocoders import Nominatim
-from geopy.exc import *
+from functools import partial
+from collections import OrderedDict, namedtuple
 try:
-    import webview  # Optional pywebview 3.0 or higher
+    from importlib.util import find_spec
 except ImportError:
-    webview = None
-try:
-    from selenium import webdriver  # Optional selenium 3.13.0 or higher
-    from selenium.webdriver.support import expected_conditions as EC
-    from selenium.webdriver.support.ui import WebDriverWait
-except ImportError:
-    webdriver = None
+    from pkgutil import find_loader as find_spec
+# Geopy 1.14.0 or higher is required, optional pywebview 3.0 or higher and
+# selenium 3.13.0 or higher are imported when used
+has_webview = find_spec('webview') is not None
+selenium_spec = find_spec('selenium')
+has_selenium = selenium_spec is not None
+# Selenium webdriver module and class names of selectable web browsers
+BROWSERS = [('chrome', 'Chrome')]
+if has_selenium:
+    # Edge options require selenium 4, look for the module without importing
+    # selenium, as finding a submodule imports its parent packages
+    paths = (getattr(selenium_spec, 'submodule_search_locations', None) or
+             [getattr(selenium_spec, 'filename', '')])  # Python 2 loader
+    edge_options = os.path.join('webdriver', 'edge', 'options.py')
+    if any(os.path.exists(os.path.join(path, edge_options)) for path in paths):
+        BROWSERS.append(('edge', 'Edge'))
 try:
     from Tkinter import *
     from tkSimpleDialog import *
-    from ConfigParser import *
+    import Queue as queue
 except ImportError:
     from tkinter import *
     from tkinter.simpledialog import *
-    from configparser import *
+    import queue
 import teslapy
 
+def create_lines(canvas, coords, **options):
+    """ Create a line item on canvas for each tuple of coordinates using a
+    single Tcl evaluation instead of one Tcl call per item """
+    opts = ' '.join('-%s {%s}' % item for item in options.items())
+    canvas.tk.eval('\n'.join('%s create line %s %s' % (canvas, ' '.join(
+        str(c) for c in line), opts) for line in coords))
+
+def time_to_minutes(text):
+    """ Convert h:mm string to minutes after midnight or None if invalid """
+    hours, sep, minutes = text.strip().partition(':')
+    if sep and hours.isdigit() and minutes.isdigit():
+        return int(hours) * 60 + int(minutes)
+    return None
+
+def read_ini(filename):
+    """ Read settings file into a dict of sections with a dict of options """
+    sections, options = {}, None
+    with open(filename) as fp:
+        for line in fp:
+            line = line.strip()
+            if not line or line[0] in '#;':
+                continue
+            if line[0] == '[':
+                options = sections.setdefault(line.strip('[]'), {})
+            elif options is not None:
+                key, _, value = line.partition('=')
+                options[key.strip().lower()] = value.strip()
+    return sections
+
+def write_ini(filename, sections):
+    """ Write dict of sections with a dict of options to settings file """
+    with open(filename, 'w') as fp:
+        for section, options in sections.items():
+            fp.write('[%s]\n' % section)
+            fp.writelines('%s = %s\n' % item for item in options.items())
+            fp.write('\n')
+
+# Label text and grid options of a table cell, options default to None
+Cell = namedtuple('Cell', 'text row column columnspan sticky')
+Cell.__new__.__defaults__ = (None, ) * 4
+
 class LabelGridDialog(Dialog):
     """ Display dialog box with table without cancel button """
 
@@ -40,8 +90,11 @@ class LabelGridDialog(Dialog):
         Dialog.__init__(self, master, title)
 
     def body(self, master):
-        for args in self.table:
-            Label(master, text=args.pop('text')).grid(args)
+        for cell in self.table:
+            # Grid options set to None are left out by Tkinter
+            Label(master, text=cell.text).grid(row=cell.row, column=cell.column,
+                                               columnspan=cell.columnspan,
+                                               sticky=cell.sticky)
 
     def buttonbox(self):
         box = Frame(self)
@@ -100,10 +153,12 @@ class ChargingDialog(Dialog):
         Label(master, text='Time:').pack(side=LEFT)
         Entry(master, textvariable=self.time).pack(side=LEFT)
 
+    def validate(self):
+        return time_to_minutes(self.time.get()) is not None
+
     def apply(self):
-        parts = self.time.get().split(':')
         self.result = {'enable': self.enable.get(),
-                       'time': int(parts[0]) * 60 + int(parts[1])}
+                       'time': time_to_minutes(self.time.get())}
 
 class DepartureDialog(Dialog):
     """ Display dialog box to get scheduled departure parameters """
@@ -137,20 +192,26 @@ class DepartureDialog(Dialog):
         Entry(group, textvariable=self.end_time).grid(row=1, column=1, padx=5, pady=5)
         group.grid(columnspan=3, sticky=EW, padx=5)
 
+    def validate(self):
+        return (time_to_minutes(self.depart_time.get()) is not None and
+                time_to_minutes(self.end_time.get()) is not None)
+
     def apply(self):
-        depart = self.depart_time.get().split(':')
-        end = self.end_time.get().split(':')
         self.result = {'enable': self.enable.get(),
-                       'departure_time': int(depart[0]) * 60 + int(depart[1]),
+                       'departure_time': time_to_minutes(self.depart_time.get()),
                        'preconditioning_enabled': self.hvac.get(),
                        'preconditioning_weekdays_only': self.hvac_weekdays.get(),
                        'off_peak_charging_enabled': self.off_peak.get(),
                        'off_peak_charging_weekdays_only': self.off_peak_weekdays.get(),
-                       'end_off_peak_time': int(end[0]) * 60 + int(end[1])}
+                       'end_off_peak_time': time_to_minutes(self.end_time.get())}
 
 class ChargeHistoryDialog(Dialog):
     """ Display dialog box with charging history graph """
 
+    # Bar colors for no charge, home, super charger and other charging
+    BAR_COLORS = ('black', 'blue', 'red', 'grey')
+    BREAKDOWN_COLORS = {'home': 'blue', 'super_charger': 'red', 'other': 'grey'}
+
     def __init__(self, master, data):
         self.data = data
         Dialog.__init__(self, master, title='Charging History')
@@ -168,47 +229,52 @@ class ChargeHistoryDialog(Dialog):
               font=('TkTextFont', 12, 'bold')).pack(fill=X)
         # Draw graph
         canvas = Canvas(master, width=440, height=410)
-        scale = self.data['charging_history_graph']['y_range_max'] / 320
-        for y in self.data['charging_history_graph']['horizontal_grid_lines']:
-            y_scaled = 335 - y / scale
-            canvas.create_line(5, y_scaled, 403, y_scaled, dash=(2, 2))
-        for x in self.data['charging_history_graph']['vertical_grid_lines']:
-            canvas.create_line(14 + x * 13, 15, 14 + x * 13, 335, dash=(2, 2))
-        for label in self.data['charging_history_graph']['x_labels']:
+        graph = self.data['charging_history_graph']
+        scale = graph['y_range_max'] / 320
+        lines = [(5, 335 - y / scale, 403, 335 - y / scale)
+                 for y in graph['horizontal_grid_lines']]
+        lines += [(14 + x * 13, 15, 14 + x * 13, 335)
+                  for x in graph['vertical_grid_lines']]
+        create_lines(canvas, lines, dash='2 2')
+        for label in graph['x_labels']:
             canvas.create_text(14 + label['raw_value'] * 13, 335,
                                text=label['value'], anchor=NE)
-        for label in self.data['charging_history_graph']['y_labels']:
+        for label in graph['y_labels']:
             text = label['value'] + '\n' + label.get('after_adornment', '')
             canvas.create_text(408, 335 - label.get('raw_value', 0) / scale,
                                text=text.strip(), anchor=W)
-        # Stacked bars
+        # Stacked bars, collected per color and drawn in one batch per color
+        bars = tuple([] for color in self.BAR_COLORS)
         x = 8
-        for point in self.data['charging_history_graph']['data_points']:
+        for point in graph['data_points']:
             y = 335
             for idx, value in enumerate(point['values']):
                 if idx == 0:
                     if value.get('raw_value', 0) <= 0:
-                        canvas.create_line(x, y, x, y - 2, width=7)
+                        bars[0].append((x, y, x, y - 2))
                     continue
-                color = {1: 'blue', 2: 'red', 3: 'grey'}.get(idx)
                 y_new = y - value.get('raw_value', 0) / scale
-                canvas.create_line(x, y, x, y_new, width=7, fill=color)
+                if y_new < y:  # Skip empty segments of the stack
+                    bars[idx if idx < len(bars) else 0].append((x, y, x, y_new))
                 y = y_new - 1
             x += 13
+        for coords, color in zip(bars, self.BAR_COLORS):
+            create_lines(canvas, coords, width=7, fill=color)
         # Breakdown
         x = 5
-        for idx, key in enumerate(self.data['total_charged_breakdown']):
-            color = {'home': 'blue', 'super_charger': 'red',
-                     'other': 'grey'}.get(key)
+        breakdown = self.data['total_charged_breakdown']
+        for idx, (key, item) in enumerate(breakdown.items()):
+            color = self.BREAKDOWN_COLORS.get(key)
             canvas.create_oval(10 + idx * 165, 370, 20 + idx * 165, 380,
                                fill=color, outline=color)
-            item = self.data['total_charged_breakdown'][key]
             text = '%s%s\n%s' % (item['value'], item['after_adornment'],
                                  item['sub_title'])
             canvas.create_text(25 + idx * 165, 375, text=text, anchor=W)
             x_new = x + item.get('raw_value', 0) * 4.1
             canvas.create_line(x, 400, x_new, 400, width=7, fill=color)
             x = x_new + 1
+        # Pack when complete. Dialog keeps itself withdrawn and the body frame
+        # unmapped until this method returns, so no intermediate redraws occur
         canvas.pack()
 
     def buttonbox(self):
@@ -233,6 +299,7 @@ class StatusBar(Frame):
         self.indicator_label.pack(side=LEFT)
         # Save default background color
         self.no_color = self.indicator_label.cget('bg')
+        self.color = self.no_color
 
     def text(self, text):
         """ Set informational text """
@@ -243,38 +310,36 @@ class StatusBar(Frame):
         self.status_value.set(status)
 
     def indicator(self, color):
-        """ Set or reset indicator color """
-        self.indicator_label.config(bg=color if color else self.no_color)
-        self.update_idletasks()
+        """ Set or reset indicator color if it has changed """
+        color = color or self.no_color
+        if color != self.color:
+            self.color = color
+            self.indicator_label.config(bg=color)
 
 class LabelVarGrid(Label):
-    """ Label widget with updatable textvariable and grid positioning """
+    """ Label widget with updatable text and grid positioning """
 
     def __init__(self, master, **kwargs):
         Label.__init__(self, master)
-        self.value = StringVar()
-        self.config(textvariable=self.value)
+        self.value = None  # Last text set, to skip no-op Tcl calls
         self.grid(**kwargs)
 
     def text(self, text):
-        """ Set textvariable of label """
-        self.value.set(text)
+        """ Set text of label if it has changed """
+        text = '%s' % (text, )
+        if text != self.value:
+            self.value = text
+            self.config(text=text)
 
 class Dashboard(Frame):
     """ Dashboard widget showing vehicle data """
 
-    def __init__(self, master, **kwargs):
-        Frame.__init__(self, master, **kwargs)
-        left = Frame(self)
-        left.pack(side=LEFT, padx=5)
-        right = Frame(self)
-        right.pack(side=LEFT, padx=5)
-        # Vehicle image on right frame
-        self.vehicle_image = Label(right)
-        self.vehicle_image.pack()
-        # Climate state on left frame
-        self.layout(left, 'Climate State',
-                    [('outside_temp', 'Outside Temperature:'),
+    DOOR = {0: 'Closed', 1: 'Open'}
+    DOOR_FIELDS = ('df', 'pf', 'dr', 'pr', 'ft', 'rt')  # Doors and trunks
+    WINDOW = {0: 'Closed', 1: 'Venting', 2: 'Open'}
+    COMPASS = ('N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE', 'S', 'SSW',
+               'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW')
+    CLIMATE_STATE = (('outside_temp', 'Outside Temperature:'),
                      ('inside_temp', 'Inside Temperature:'),
                      ('driver_temp', 'Driver Temperature Setting:'),
                      ('passenger_temp', 'Passenger Temperature Setting:'),
@@ -283,10 +348,8 @@ class Dashboard(Frame):
                      ('driver_heater', 'Driver Seat Heater:'),
                      ('passenger_heater', 'Passenger Seat Heater:'),
                      ('front_defroster', 'Is Front Defroster On:'),
-                     ('rear_defroster', 'Is Rear Defroster On:')])
-        # Vehicle state on left frame
-        self.layout(left, 'Vehicle State',
-                    [('vehicle_name', 'Vehicle Name:'),
+                     ('rear_defroster', 'Is Rear Defroster On:'))
+    VEHICLE_STATE = (('vehicle_name', 'Vehicle Name:'),
                      ('odometer', 'Odometer:'),
                      ('car_version', 'Car Version:'),
                      ('locked', 'Locked:'),
@@ -315,57 +378,75 @@ class Dashboard(Frame):
                      ('sw_update', 'Software Update:'),
                      ('sw_duration', 'Expected Duration:'),
                      ('update_ver', 'Update Version:'),
-                     ('inst_perc', 'Install Percentage:')])
+                     ('inst_perc', 'Install Percentage:'))
+    DRIVE_STATE = (('power', 'Power:'),
+                   ('speed', 'Speed:'),
+                   ('shift_state', 'Shift State:'),
+                   ('heading', 'Heading:'))
+    CHARGING_STATE = (('charging_state', 'Charging State:'),
+                      ('time_to_full', 'Time To Full Charge:'),
+                      ('charger_voltage', 'Charger Voltage:'),
+                      ('charger_request', 'Requested Current:'),
+                      ('charger_current', 'Charger Actual Current:'),
+                      ('charger_power', 'Charger Power:'),
+                      ('battery_level', 'Battery Level:'),
+                      ('charge_rate', 'Charge Rate:'),
+                      ('battery_range', 'Battery Range:'),
+                      ('energy_added', 'Charge Energy Added:'),
+                      ('range_added', 'Charge Range Added:'),
+                      ('charge_limit_soc', 'Charge Limit SOC:'),
+                      ('est_battery_range', 'Estimated Battery Range:'),
+                      ('charge_port_door', 'Charge Port Door Open:'),
+                      ('charge_port_latch', 'Charge Port Latch:'),
+                      ('fast_charger', 'Fast Charger:'),
+                      ('trip_charging', 'Trip Charging:'),
+                      ('charging_pending', 'Scheduled Charging:'),
+                      ('charging_start', 'Charging Start Time:'),
+                      ('scheduled_charging', 'Scheduled Charging Mode:'),
+                      ('departure_time', 'Scheduled Departure:'),
+                      ('off_peak_charge', 'Off Peak Charging:'),
+                      ('off_peak_times', 'Off Peak Charging Times:'),
+                      ('off_peak_end_time', 'Off Peak End Time:'),
+                      ('preconditioning', 'Preconditioning:'),
+                      ('preconditioning_times', 'Preconditioning Times:'))
+    VEHICLE_CONFIG = (('car_type', 'Car Type:'),
+                      ('trim_badging', 'Trim Badging:'),
+                      ('air_suspension', 'Has Air Suspension:'),
+                      ('exterior_color', 'Exterior Color:'),
+                      ('wheel_type', 'Wheel Type:'),
+                      ('spoiler_type', 'Spoiler Type:'),
+                      ('roof_color', 'Roof Color:'),
+                      ('charge_port_type', 'Charge Port Type:'))
+    SERVICE = (('next_appt', 'Next appointment:'),
+               ('in_service', 'In service:'))
+
+    def __init__(self, master, **kwargs):
+        Frame.__init__(self, master, **kwargs)
+        self.values = []  # Value widgets to clear on reset
+        self.snapshots = {}  # Vehicle data sections shown by name
+        left = Frame(self)
+        left.pack(side=LEFT, padx=5)
+        right = Frame(self)
+        right.pack(side=LEFT, padx=5)
+        # Vehicle image on right frame
+        self.vehicle_image = Label(right)
+        self.vehicle_image.pack()
+        # Climate state on left frame
+        self.layout(left, 'Climate State', self.CLIMATE_STATE)
+        # Vehicle state on left frame
+        self.layout(left, 'Vehicle State', self.VEHICLE_STATE)
         # Drive state on right frame
-        group = self.layout(right, 'Drive State',
-                            [('power', 'Power:'),
-                             ('speed', 'Speed:'),
-                             ('shift_state', 'Shift State:'),
-                             ('heading', 'Heading:')])
+        group = self.layout(right, 'Drive State', self.DRIVE_STATE)
         Label(group, text='GPS:').grid(row=2, column=0, sticky=E)
         self.gps = LabelVarGrid(group, row=2, column=1, columnspan=3, sticky=W)
         self.gps.config(wraplength=330, justify=LEFT)
+        self.values.append(self.gps)
         # Charging state on right frame
-        self.layout(right, 'Charging State',
-                    [('charging_state', 'Charging State:'),
-                     ('time_to_full', 'Time To Full Charge:'),
-                     ('charger_voltage', 'Charger Voltage:'),
-                     ('charger_request', 'Requested Current:'),
-                     ('charger_current', 'Charger Actual Current:'),
-                     ('charger_power', 'Charger Power:'),
-                     ('battery_level', 'Battery Level:'),
-                     ('charge_rate', 'Charge Rate:'),
-                     ('battery_range', 'Battery Range:'),
-                     ('energy_added', 'Charge Energy Added:'),
-                     ('range_added', 'Charge Range Added:'),
-                     ('charge_limit_soc', 'Charge Limit SOC:'),
-                     ('est_battery_range', 'Estimated Battery Range:'),
-                     ('charge_port_door', 'Charge Port Door Open:'),
-                     ('charge_port_latch', 'Charge Port Latch:'),
-                     ('fast_charger', 'Fast Charger:'),
-                     ('trip_charging', 'Trip Charging:'),
-                     ('charging_pending', 'Scheduled Charging:'),
-                     ('charging_start', 'Charging Start Time:'),
-                     ('scheduled_charging', 'Scheduled Charging Mode:'),
-                     ('departure_time', 'Scheduled Departure:'),
-                     ('off_peak_charge', 'Off Peak Charging:'),
-                     ('off_peak_times', 'Off Peak Charging Times:'),
-                     ('off_peak_end_time', 'Off Peak End Time:'),
-                     ('preconditioning', 'Preconditioning:'),
-                     ('preconditioning_times', 'Preconditioning Times:')])
+        self.layout(right, 'Charging State', self.CHARGING_STATE)
         # Vehicle config on left frame
-        self.layout(left, 'Vehicle Config',
-                    [('car_type', 'Car Type:'),
-                     ('trim_badging', 'Trim Badging:'),
-                     ('air_suspension', 'Has Air Suspension:'),
-                     ('exterior_color', 'Exterior Color:'),
-                     ('wheel_type', 'Wheel Type:'),
-                     ('spoiler_type', 'Spoiler Type:'),
-                     ('roof_color', 'Roof Color:'),
-                     ('charge_port_type', 'Charge Port Type:')])
+        self.layout(left, 'Vehicle Config', self.VEHICLE_CONFIG)
         # Service on right frame
-        self.layout(right, 'Service', [('next_appt', 'Next appointment:'),
-                                      ('in_service', 'In service:')])
+        self.layout(right, 'Service', self.SERVICE)
 
     def layout(self, master, text, labels):
         """ Group four columns of widgets from list of tupels """
@@ -375,145 +456,172 @@ class Dashboard(Frame):
             Label(group, text=txt).grid(row=i // 2, column=i % 2 * 2, sticky=E)
             w = LabelVarGrid(group, row=i // 2, column=i % 2 * 2 + 1, sticky=W)
             setattr(self, name, w)  # Set named widget to dashboard
+            self.values.append(w)
         return group
 
+    def changed(self, name, data):
+        """ Return True if section data has changed since last update, while
+        ignoring the timestamp """
+        data = dict(data, timestamp=None)
+        if self.snapshots.get(name) == data:
+            return False
+        self.snapshots[name] = data
+        return True
+
+    def reset(self):
+        """ Clear vehicle image and values of dashboard widgets """
+        self.snapshots = {}
+        self.vehicle_image.config(image='')
+        for w in self.values:
+            w.text('')
+
     def update_widgets(self):
         """ Set values of dashboard widgets """
-        cl = app.vehicle['climate_state']
-        ve = app.vehicle['vehicle_state']
-        dr = app.vehicle['drive_state']
-        ch = app.vehicle['charge_state']
-        co = app.vehicle['vehicle_config']
+        vehicle = app.vehicle
+        cl = vehicle['climate_state']
+        ve = vehicle['vehicle_state']
+        dr = vehicle['drive_state']
+        ch = vehicle['charge_state']
+        co = vehicle['vehicle_config']
+        sl = ve['speed_limit_mode']
+        su = ve['software_update']
+        # Units may have changed, so update all sections
+        if self.changed('gui_settings', vehicle['gui_settings']):
+            self.snapshots = {'gui_settings': self.snapshots['gui_settings']}
         # pylint: disable=E1101
         # Climate state
-        self.outside_temp.text(app.vehicle.temp_units(cl['outside_temp']))
-        self.inside_temp.text(app.vehicle.temp_units(cl['inside_temp']))
-        self.driver_temp.text(app.vehicle.temp_units(cl['driver_temp_setting']))
-        self.passenger_temp.text(app.vehicle.temp_units(cl['passenger_temp_setting']))
-        self.is_climate_on.text(str(cl['is_climate_on']))
-        self.fan_status.text(cl['fan_status'])
-        self.driver_heater.text(cl['seat_heater_left'])
-        self.passenger_heater.text(cl['seat_heater_right'])
-        self.front_defroster.text(str(cl['is_front_defroster_on']))
-        self.rear_defroster.text(str(cl['is_rear_defroster_on']))
+        if self.changed('climate_state', cl):
+            self.outside_temp.text(vehicle.temp_units(cl['outside_temp']))
+            self.inside_temp.text(vehicle.temp_units(cl['inside_temp']))
+            self.driver_temp.text(vehicle.temp_units(cl['driver_temp_setting']))
+            self.passenger_temp.text(vehicle.temp_units(cl['passenger_temp_setting']))
+            self.is_climate_on.text(str(cl['is_climate_on']))
+            self.fan_status.text(cl['fan_status'])
+            self.driver_heater.text(cl['seat_heater_left'])
+            self.passenger_heater.text(cl['seat_heater_right'])
+            self.front_defroster.text(str(cl['is_front_defroster_on']))
+            self.rear_defroster.text(str(cl['is_rear_defroster_on']))
         # Vehicle state
-        self.vehicle_name.text(ve['vehicle_name'])
-        self.odometer.text(app.vehicle.dist_units(ve['odometer']))
-        self.car_version.text(ve['car_version'])
-        self.locked.text(str(ve['locked']))
-        door = {0: 'Closed', 1: 'Open'}
-        self.df.text(door.get(ve['df']))
-        self.pf.text(door.get(ve['pf']))
-        self.dr.text(door.get(ve['dr']))
-        self.pr.text(door.get(ve['pr']))
-        window = {0: 'Closed', 1: 'Venting', 2: 'Open'}
-        self.fd.text(window.get(ve.get('fd_window')))
-        self.fp.text(window.get(ve.get('fp_window')))
-        self.rd.text(window.get(ve.get('rd_window')))
-        self.rp.text(window.get(ve.get('rp_window')))
-        self.ft.text(door.get(ve['ft']))
-        self.rt.text(door.get(ve['rt']))
-        self.remote_start.text(str(ve['remote_start']))
-        self.user_present.text(str(ve['is_user_present']))
-        self.speed_limit.text(str(ve['speed_limit_mode']['active']))
-        limit = ve['speed_limit_mode']['current_limit_mph']
-        self.current_limit.text(app.vehicle.dist_units(limit, True))
-        self.speed_limit_pin.text(str(ve['speed_limit_mode']['pin_code_set']))
-        self.sentry_mode.text(str(ve.get('sentry_mode')))
-        self.valet_mode.text(str(ve['valet_mode']))
-        self.valet_pin.text(str(not 'valet_pin_needed' in ve))
-        self.tmps_fl.text(ve.get('tpms_pressure_fl'))
-        self.tmps_fr.text(ve.get('tpms_pressure_fr'))
-        self.tmps_rl.text(ve.get('tpms_pressure_rl'))
-        self.tmps_rr.text(ve.get('tpms_pressure_rr'))
-        status = ve['software_update']['status'] or 'unavailable'
-        wt = ve['software_update'].get('warning_time_remaining_ms', 0) / 1000
-        status += ' in {:02.0f}:{:02.0f}'.format(*divmod(wt, 60)) if wt else ''
-        self.sw_update.text(status.capitalize())
-        sueds = divmod(ve['software_update']['expected_duration_sec'] / 60, 60)
-        self.sw_duration.text('{:02.0f}:{:02.0f}'.format(*sueds))
-        self.update_ver.text(ve['software_update'].get('version') or 'None')
-        self.inst_perc.text(ve['software_update'].get('install_perc') or 'None')
+        if self.changed('vehicle_state', ve):
+            self.vehicle_name.text(ve['vehicle_name'])
+            self.odometer.text(vehicle.dist_units(ve['odometer']))
+            self.car_version.text(ve['car_version'])
+            self.locked.text(str(ve['locked']))
+            for name in self.DOOR_FIELDS:
+                getattr(self, name).text(self.DOOR.get(ve[name]))
+            self.fd.text(self.WINDOW.get(ve.get('fd_window')))
+            self.fp.text(self.WINDOW.get(ve.get('fp_window')))
+            self.rd.text(self.WINDOW.get(ve.get('rd_window')))
+            self.rp.text(self.WINDOW.get(ve.get('rp_window')))
+            self.remote_start.text(str(ve['remote_start']))
+            self.user_present.text(str(ve['is_user_present']))
+            self.speed_limit.text(str(sl['active']))
+            limit = sl['current_limit_mph']
+            self.current_limit.text(vehicle.dist_units(limit, True))
+            self.speed_limit_pin.text(str(sl['pin_code_set']))
+            self.sentry_mode.text(str(ve.get('sentry_mode')))
+            self.valet_mode.text(str(ve['valet_mode']))
+            self.valet_pin.text(str(not 'valet_pin_needed' in ve))
+            self.tmps_fl.text(ve.get('tpms_pressure_fl'))
+            self.tmps_fr.text(ve.get('tpms_pressure_fr'))
+            self.tmps_rl.text(ve.get('tpms_pressure_rl'))
+            self.tmps_rr.text(ve.get('tpms_pressure_rr'))
+            status = su['status'] or 'unavailable'
+            wt = su.get('warning_time_remaining_ms', 0) / 1000
+            status += ' in ' + self._duration_to_str(wt) if wt else ''
+            self.sw_update.text(status.capitalize())
+            sueds = su['expected_duration_sec'] / 60
+            self.sw_duration.text(self._duration_to_str(sueds))
+            self.update_ver.text(su.get('version') or 'None')
+            self.inst_perc.text(su.get('install_perc') or 'None')
         # Drive state
-        power = 0 if dr['power'] is None else dr['power']
-        self.power.text('%d kW' % power)
-        speed = 0 if dr['speed'] is None else dr['speed']
-        self.speed.text(app.vehicle.dist_units(speed, True))
-        self.shift_state.text(str(dr['shift_state']))
-        self.heading.text(self._heading_to_str(dr['heading']))
+        if self.changed('drive_state', dr):
+            power = 0 if dr['power'] is None else dr['power']
+            self.power.text('%d kW' % power)
+            speed = 0 if dr['speed'] is None else dr['speed']
+            self.speed.text(vehicle.dist_units(speed, True))
+            self.shift_state.text(str(dr['shift_state']))
+            self.heading.text(self._heading_to_str(dr['heading']))
         self.gps.text(app.update_thread.location)
         # Charging state
-        self.charging_state.text(ch['charging_state'])
-        ttfc = divmod(ch['time_to_full_charge'] * 60, 60)
-        self.time_to_full.text('{:02.0f}:{:02.0f}'.format(*ttfc))
-        volt = 0 if ch['charger_voltage'] is None else ch['charger_voltage']
-        self.charger_voltage.text('%d V' % volt)
-        self.charger_request.text('%d A' % ch['charge_current_request'])
-        ph = '3 x ' if ch['charger_phases'] == 2 else ''
-        amps = 0 if ch['charger_actual_current'] is None else ch['charger_actual_current']
-        self.charger_current.text('%s%d A' % (ph, amps))
-        charger_power = 0 if ch['charger_power'] is None else ch['charger_power']
-        self.charger_power.text('%d kW' % charger_power)
-        if ch['usable_battery_level'] < ch['battery_level']:
-            usable = ' (%d %% usable)' % ch['usable_battery_level']
-        else:
-            usable = ''
-        self.battery_level.text('%d %%%s' % (ch['battery_level'], usable))
-        self.charge_rate.text(app.vehicle.dist_units(ch['charge_rate'], True))
-        self.battery_range.text(app.vehicle.dist_units(ch['battery_range']))
-        self.energy_added.text('%.1f kWh' % ch['charge_energy_added'])
-        self.range_added.text(app.vehicle.dist_units(ch['charge_miles_added_rated']))
-        self.charge_limit_soc.text('%d %%' % ch['charge_limit_soc'])
-        self.est_battery_range.text(app.vehicle.dist_units(ch['est_battery_range']))
-        self.charge_port_door.text(str(ch['charge_port_door_open']))
-        self.charge_port_latch.text(str(ch['charge_port_latch']))
-        self.fast_charger.text(str(ch['fast_charger_present']))
-        self.trip_charging.text(str(ch['trip_charging']))
-        self.charging_pending.text(str(ch['scheduled_charging_pending']))
-        if ch['scheduled_charging_start_time']:
-            st = time.localtime(ch['scheduled_charging_start_time'])
-            self.charging_start.text(time.strftime('%X', st))
-        else:
-            self.charging_start.text(None)
-        self.scheduled_charging.text(ch.get('scheduled_charging_mode'))
-        if ch.get('scheduled_departure_time'):
-            dt = time.localtime(ch['scheduled_departure_time'])
-            self.departure_time.text(time.strftime('%X', dt))
-        else:
-            self.departure_time.text(None)
-        self.off_peak_charge.text(str(ch.get('off_peak_charging_enabled')))
-        self.off_peak_times.text(ch.get('off_peak_charging_times'))
-        if 'off_peak_hours_end_time' in ch:
-            ophet = divmod(ch['off_peak_hours_end_time'], 60)
-            self.off_peak_end_time.text('{:02.0f}:{:02.0f}'.format(*ophet))
-        else:
-            self.off_peak_end_time.text(None)
-        self.preconditioning.text(str(ch.get('preconditioning_enabled')))
-        self.preconditioning_times.text(ch.get('preconditioning_times'))
+        if self.changed('charge_state', ch):
+            self.charging_state.text(ch['charging_state'])
+            ttfc = ch['time_to_full_charge'] * 60
+            self.time_to_full.text(self._duration_to_str(ttfc))
+            volt = 0 if ch['charger_voltage'] is None else ch['charger_voltage']
+            self.charger_voltage.text('%d V' % volt)
+            self.charger_request.text('%d A' % ch['charge_current_request'])
+            ph = '3 x ' if ch['charger_phases'] == 2 else ''
+            amps = 0 if ch['charger_actual_current'] is None else ch['charger_actual_current']
+            self.charger_current.text('%s%d A' % (ph, amps))
+            charger_power = 0 if ch['charger_power'] is None else ch['charger_power']
+            self.charger_power.text('%d kW' % charger_power)
+            if ch['usable_battery_level'] < ch['battery_level']:
+                usable = ' (%d %% usable)' % ch['usable_battery_level']
+            else:
+                usable = ''
+            self.battery_level.text('%d %%%s' % (ch['battery_level'], usable))
+            self.charge_rate.text(vehicle.dist_units(ch['charge_rate'], True))
+            self.battery_range.text(vehicle.dist_units(ch['battery_range']))
+            self.energy_added.text('%.1f kWh' % ch['charge_energy_added'])
+            self.range_added.text(vehicle.dist_units(ch['charge_miles_added_rated']))
+            self.charge_limit_soc.text('%d %%' % ch['charge_limit_soc'])
+            self.est_battery_range.text(vehicle.dist_units(ch['est_battery_range']))
+            self.charge_port_door.text(str(ch['charge_port_door_open']))
+            self.charge_port_latch.text(str(ch['charge_port_latch']))
+            self.fast_charger.text(str(ch['fast_charger_present']))
+            self.trip_charging.text(str(ch['trip_charging']))
+            self.charging_pending.text(str(ch['scheduled_charging_pending']))
+            if ch['scheduled_charging_start_time']:
+                st = time.localtime(ch['scheduled_charging_start_time'])
+                self.charging_start.text(time.strftime('%X', st))
+            else:
+                self.charging_start.text(None)
+            self.scheduled_charging.text(ch.get('scheduled_charging_mode'))
+            if ch.get('scheduled_departure_time'):
+                dt = time.localtime(ch['scheduled_departure_time'])
+                self.departure_time.text(time.strftime('%X', dt))
+            else:
+                self.departure_time.text(None)
+            self.off_peak_charge.text(str(ch.get('off_peak_charging_enabled')))
+            self.off_peak_times.text(ch.get('off_peak_charging_times'))
+            if 'off_peak_hours_end_time' in ch:
+                ophet = ch['off_peak_hours_end_time']
+                self.off_peak_end_time.text(self._duration_to_str(ophet))
+            else:
+                self.off_peak_end_time.text(None)
+            self.preconditioning.text(str(ch.get('preconditioning_enabled')))
+            self.preconditioning_times.text(ch.get('preconditioning_times'))
         # Vehicle config
-        self.car_type.text(co['car_type'])
-        self.trim_badging.text(co.get('trim_badging'))
-        self.air_suspension.text(str(co['has_air_suspension']))
-        self.exterior_color.text(co['exterior_color'])
-        self.wheel_type.text(co['wheel_type'])
-        self.spoiler_type.text(co['spoiler_type'])
-        self.roof_color.text(co['roof_color'])
-        self.charge_port_type.text(co['charge_port_type'])
+        if self.changed('vehicle_config', co):
+            self.car_type.text(co['car_type'])
+            self.trim_badging.text(co.get('trim_badging'))
+            self.air_suspension.text(str(co['has_air_suspension']))
+            self.exterior_color.text(co['exterior_color'])
+            self.wheel_type.text(co['wheel_type'])
+            self.spoiler_type.text(co['spoiler_type'])
+            self.roof_color.text(co['roof_color'])
+            self.charge_port_type.text(co['charge_port_type'])
 
     @staticmethod
-    def _heading_to_str(deg):
+    def _duration_to_str(value):
+        """ Convert minutes to hh:mm or seconds to mm:ss string """
+        value = int(round(value))
+        return '%02d:%02d' % (value // 60, value % 60)
+
+    @classmethod
+    def _heading_to_str(cls, deg):
         """ Convert heading in degrees to a direction string """
-        return ['NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE',
-                'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW',
-                'NNW', 'N'][int(abs((deg - 11.25) % 360) / 22.5)]
+        return cls.COMPASS[int((deg + 11.25) % 360 // 22.5)]
 
 def show_webview(url):
     """ Shows the SSO page in a webview and returns the redirected URL """
+    import webview
     result = ['']
     window = webview.create_window('Login', url)
     def on_loaded():
         result[0] = window.get_current_url()
-        if 'void/callback' in result[0].split('?')[0]:
+        if 'void/callback' in result[0].partition('?')[0]:
             window.destroy()
     try:
         window.events.loaded += on_loaded
@@ -525,18 +633,53 @@ def show_webview(url):
 class App(Tk):
     """ Main application class """
 
+    # Command menu entries as label, method name and arguments. The media
+    # cascade is inserted at the entry without a method name.
+    COMMANDS = (('Wake up', 'wake_up', ()),
+                ('Nearby charging sites', 'charging_sites', ()),
+                ('Honk horn', 'cmd', ('HONK_HORN', )),
+                ('Flash lights', 'cmd', ('FLASH_LIGHTS', )),
+                ('Lock/unlock', 'lock_unlock', ()),
+                ('Climate on/off', 'climate_on_off', ()),
+                ('Set temperature', 'set_temperature', ()),
+                ('Actuate frunk', 'actuate_trunk', ('front', )),
+                ('Actuate trunk', 'actuate_trunk', ('rear', )),
+                ('Remote start drive', 'cmd', ('REMOTE_START', )),
+                ('Set charge limit', 'set_charge_limit', ()),
+                ('Open/close charge port', 'open_close_charge_port', ()),
+                ('Start/stop charge', 'start_stop_charge', ()),
+                ('Seat heater request', 'seat_heater', ()),
+                ('Control sun roof', 'vent_close_sun_roof', ()),
+                ('Media', None, ()),
+                ('Schedule sw update', 'schedule_sw_update', ()),
+                ('Cancel software update', 'cmd', ('CANCEL_SOFTWARE_UPDATE', )),
+                ('Control windows', 'window_control', ()),
+                ('Max defrost', 'max_defrost', ()),
+                ('Set charge amps', 'charging_amps', ()),
+                ('Scheduled charging', 'scheduled_charging', ()),
+                ('Scheduled departure', 'scheduled_departure', ()))
+    # Status polling delay in ms rises from the minimum after a state change
+    # to the maximum for the state in the given number of polls
+    STATUS_MIN_DELAY = 30000
+    STATUS_MAX_DELAY = {'online': 60000}
+    STATUS_MAX_DELAY_DEFAULT = 300000
+    STATUS_STEPS = 4
+    UPDATE_MAX_DELAY = 60000  # Backoff limit of dashboard update polling
+    UPDATE_FAST_DELAY = 1000  # Polling rate while driving, charging or in use
+    UPDATE_DELAYS = (2000, 4000, 10000, 30000)  # Selectable polling rates
+
     def __init__(self, **kwargs):
         Tk.__init__(self, **kwargs)
         self.title('Tesla')
         self.protocol('WM_DELETE_WINDOW', self.save_and_quit)
         # Add menu bar
         menu = Menu(self)
-        app_menu = Menu(menu, tearoff=0)
-        app_menu.add_command(label='Login', command=self.login)
-        app_menu.add_command(label='Logout', command=self.logout)
-        app_menu.add_separator()
-        app_menu.add_command(label='Exit', command=self.save_and_quit)
-        menu.add_cascade(label='App', menu=app_menu)
+        self.app_menu = Menu(menu, tearoff=0)
+        self.app_menu.add_command(label='Login', command=self.login)
+        self.app_menu.add_command(label='Logout', command=self.logout)
+        self.app_menu.add_separator()
+        self.app_menu.add_command(label='Exit', command=self.save_and_quit)
+        menu.add_cascade(label='App', menu=self.app_menu)
         self.vehicle_menu = Menu(menu, tearoff=0)
         self.vehicle_menu.add_command(label='Show option codes', state=DISABLED,
                                       command=self.option_codes)
@@ -547,61 +690,36 @@ class App(Tk):
         self.vehicle_menu.add_separator()
         menu.add_cascade(label='Vehicle', menu=self.vehicle_menu)
         self.cmd_menu = Menu(menu, tearoff=0)
-        self.cmd_menu.add_command(label='Wake up', state=DISABLED,
-                                  command=self.wake_up)
-        self.cmd_menu.add_command(label='Nearby charging sites', state=DISABLED,
-                                  command=self.charging_sites)
-        self.cmd_menu.add_command(self.add_cmd_args('HONK_HORN'))
-        self.cmd_menu.add_command(self.add_cmd_args('FLASH_LIGHTS'))
-        self.cmd_menu.add_command(label='Lock/unlock', state=DISABLED,
-                                  command=self.lock_unlock)
-        self.cmd_menu.add_command(label='Climate on/off', state=DISABLED,
-                                  command=self.climate_on_off)
-        self.cmd_menu.add_command(label='Set temperature', state=DISABLED,
-                                  command=self.set_temperature)
-        self.cmd_menu.add_command(label='Actuate frunk', state=DISABLED,
-                                  command=lambda: self.actuate_trunk('front'))
-        self.cmd_menu.add_command(label='Actuate trunk', state=DISABLED,
-                                  command=lambda: self.actuate_trunk('rear'))
-        self.cmd_menu.add_command(label='Remote start drive', state=DISABLED,
-                                  command=lambda: self.cmd('REMOTE_START'))
-        self.cmd_menu.add_command(label='Set charge limit', state=DISABLED,
-                                  command=self.set_charge_limit)
-        self.cmd_menu.add_command(label='Open/close charge port', state=DISABLED,
-                                  command=self.open_close_charge_port)
-        self.cmd_menu.add_command(label='Start/stop charge', state=DISABLED,
-                                  command=self.start_stop_charge)
-        self.cmd_menu.add_command(label='Seat heater request', state=DISABLED,
-                                  command=self.seat_heater)
-        self.cmd_menu.add_command(label='Control sun roof', state=DISABLED,
-                                  command=self.vent_close_sun_roof)
         self.media_menu = Menu(menu, tearoff=0)
-        self.cmd_menu.add_cascade(label='Media', state=DISABLED,
-                                  menu=self.media_menu)
+        add_command = self.cmd_menu.add_command
+        for label, name, args in self.COMMANDS:
+            if name is None:
+                self.cmd_menu.add_cascade(label=label, state=DISABLED,
+                                          menu=self.media_menu)
+                continue
+            add_command(label=label, state=DISABLED,
+                        command=partial(getattr(self, name), *args))
         for endpoint in ['MEDIA_TOGGLE_PLAYBACK', 'MEDIA_NEXT_TRACK',
                          'MEDIA_PREVIOUS_TRACK', 'MEDIA_NEXT_FAVORITE',
                          'MEDIA_PREVIOUS_FAVORITE', 'MEDIA_VOLUME_UP',
                          'MEDIA_VOLUME_DOWN']:
             self.media_menu.add_command(self.add_cmd_args(endpoint))
-        self.cmd_menu.add_command(label='Schedule sw update', state=DISABLED,
-                                  command=self.schedule_sw_update)
-        self.cmd_menu.add_command(self.add_cmd_args('CANCEL_SOFTWARE_UPDATE'))
-        self.cmd_menu.add_command(label='Control windows', state=DISABLED,
-                                  command=self.window_control)
-        self.cmd_menu.add_command(label='Max defrost', state=DISABLED,
-                                  command=self.max_defrost)
-        self.cmd_menu.add_command(label='Set charge amps', state=DISABLED,
-                                  command=self.charging_amps)
-        self.cmd_menu.add_command(label='Scheduled charging', state=DISABLED,
-                                  command=self.scheduled_charging)
-        self.cmd_menu.add_command(label='Scheduled departure', state=DISABLED,
-                                  command=self.scheduled_departure)
+        # Index of last entries, menus do not change after this point
+        self.cmd_menu_end = self.cmd_menu.index(END)
+        self.media_menu_end = self.media_menu.index(END)
         menu.add_cascade(label='Command', menu=self.cmd_menu)
         opt_menu = Menu(menu, tearoff=0)
         self.auto_refresh = BooleanVar()
         opt_menu.add_checkbutton(label='Auto refresh',
                                  variable=self.auto_refresh,
                                  command=self.update_dashboard)
+        interval_menu = Menu(menu, tearoff=0)
+        opt_menu.add_cascade(label='Refresh interval', menu=interval_menu)
+        self.update_delay = IntVar(value=4000)
+        for delay in self.UPDATE_DELAYS:
+            interval_menu.add_radiobutton(label='%d seconds' % (delay // 1000),
+                                          value=delay,
+                                          variable=self.update_delay)
         self.debug = BooleanVar()
         opt_menu.add_checkbutton(label='Console debugging', variable=self.debug,
                                  command=self.apply_settings)
@@ -612,14 +730,13 @@ class App(Tk):
         opt_menu.add_command(label='Set SSO base URL', command=self.set_sso_url)
         web_menu = Menu(menu, tearoff=0)
         opt_menu.add_cascade(label='Web browser', menu=web_menu,
-                             state=NORMAL if webdriver else DISABLED)
+                             state=NORMAL if has_selenium else DISABLED)
         self.browser = IntVar()
-        web_menu.add_radiobutton(label='Chrome', value=0, variable=self.browser)
-        if webdriver and hasattr(webdriver.edge, 'options'):
-            web_menu.add_radiobutton(label='Edge', value=1, variable=self.browser)
+        for i, (module, name) in enumerate(BROWSERS):
+            web_menu.add_radiobutton(label=name, value=i, variable=self.browser)
         self.selenium = BooleanVar()
         opt_menu.add_checkbutton(label='Use selenium', variable=self.selenium,
-                                 state=NORMAL if webdriver else DISABLED,
+                                 state=NORMAL if has_selenium else DISABLED,
                                  command=self.apply_settings)
         menu.add_cascade(label='Options', menu=opt_menu)
         help_menu = Menu(menu, tearoff=0)
@@ -627,6 +744,34 @@ class App(Tk):
         menu.add_cascade(label='Help', menu=help_menu)
         self.config(menu=menu)
         self.update_scheduled = 0
+        self.refresh_pending = False
+        self.refresh_after = None  # Identifier of pending delayed refresh
+        self.update_paused = False  # Dashboard update held while minimized
+        self.last_state = None
+        self.same_state_cnt = 0
+        self.commands_state = DISABLED  # Last state set to command entries
+        self.timestamp = None  # Vehicle state timestamp shown in status bar
+        # Handle virtual events generated by finished threads
+        for event, handler in (
+                (LoginThread.event, self.process_login),
+                (ImageThread.event, self.process_select),
+                (UpdateThread.event, self.process_update_dashboard),
+                ('<<ServiceDone>>', self.process_service),
+                ('<<StatusDone>>', self.process_status),
+                ('<<WakeUpDone>>', self.process_wake_up),
+                ('<<NearbySitesDone>>', self.process_charging_sites),
+                ('<<ChargeHistoryDone>>', self.process_charge_history),
+                ('<<CommandDone>>', self.process_cmd)):
+            self.bind(event, handler)
+        self.bind('<Map>', self.resume_dashboard)
+        # Start worker thread for vehicle data and address lookups
+        self.update_pending = False
+        self.images = {}  # Vehicle images by VIN and option codes
+        self.image_threads = {}  # Pending image threads by same key
+        self.tables = {}  # Dialog tables by dialog title and VIN
+        self.update_results = queue.Queue()
+        self.update_thread = UpdateThread(self.update_results)
+        self.update_thread.start()
         # Add widgets
         self.dashboard = Dashboard(self)
         self.dashboard.pack(pady=5, fill=X)
@@ -634,19 +779,21 @@ class App(Tk):
         self.status.pack(side=BOTTOM, fill=X)
         self.status.text('Not logged in')
         # Read config
-        config = RawConfigParser()
         self.email, self.proxy, self.sso_url = '', '', ''
         try:
-            config.read('gui.ini')
-            self.email = config.get('app', 'email')
-            self.verify.set(config.get('app', 'verify'))
-            self.proxy = config.get('app', 'proxy')
-            self.sso_url = config.get('app', 'sso_url')
-            self.browser.set(config.get('app', 'browser'))
-            self.selenium.set(config.get('app', 'selenium'))
-            self.auto_refresh.set(config.get('display', 'auto_refresh'))
-            self.debug.set(config.get('display', 'debug'))
-        except (NoSectionError, NoOptionError, ParsingError):
+            config = read_ini('gui.ini')
+            self.email = config['app']['email']
+            self.verify.set(config['app']['verify'])
+            self.proxy = config['app']['proxy']
+            self.sso_url = config['app']['sso_url']
+            self.browser.set(config['app']['browser'])
+            if self.browser.get() >= len(BROWSERS):
+                self.browser.set(0)  # Browser no longer available
+            self.selenium.set(config['app']['selenium'])
+            self.auto_refresh.set(config['display']['auto_refresh'])
+            self.debug.set(config['display']['debug'])
+            self.update_delay.set(config['display']['update_delay'])
+        except (IOError, KeyError):
             pass
         # Initialize logging
         default_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -661,15 +808,17 @@ class App(Tk):
     def custom_auth(self, url):
         """ Automated or manual authentication """
         # Use pywebview if available and selenium not selected
-        if webview and not self.selenium.get():
+        if has_webview and not self.selenium.get():
             return pool.apply(show_webview, (url, ))  # Run in separate process
         # Use selenium if available and selected
-        if webdriver and self.selenium.get():
-            options = [webdriver.chrome,
-                       webdriver.edge][self.browser.get()].options.Options()
+        if has_selenium and self.selenium.get():
+            from selenium import webdriver
+            from selenium.webdriver.support import expected_conditions as EC
+            from selenium.webdriver.support.ui import WebDriverWait
+            module, name = BROWSERS[self.browser.get()]
+            options = getattr(webdriver, module).options.Options()
             options.add_argument('--disable-blink-features=AutomationControlled')
-            with [webdriver.Chrome,
-                  webdriver.Edge][self.browser.get()](options=options) as browser:
+            with getattr(webdriver, name)(options=options) as browser:
                 browser.get(url)
                 wait = WebDriverWait(browser, 300)
                 wait.until(EC.url_contains('void/callback'))
@@ -677,20 +826,17 @@ class App(Tk):
         # Fallback to manual authentication
         webbrowser.open(url)
         # Ask user for callback URL in new dialog
-        result = [None]
-        event = threading.Event()
+        result = queue.Queue(maxsize=1)
         def show_dialog():
             """ Inner function to show dialog from main thread """
-            result[0] = askstring('Login', 'URL after authentication:')
-            event.set()  # Signal completion
+            result.put(askstring('Login', 'URL after authentication:'))
         self.after_idle(show_dialog)  # Start from main thread
-        event.wait()  # Block login thread until URL is entered
-        return result[0]
+        return result.get()  # Block login thread until URL is entered
 
     def login(self):
         """ Display login dialog and start new thread to get vehicle list """
-        prompt = 'Email:' if (webdriver and self.selenium.get()) or \
-                 (webview and not self.selenium.get()) else 'Use browser' \
+        prompt = 'Email:' if (has_selenium and self.selenium.get()) or \
+                 (has_webview and not self.selenium.get()) else 'Use browser' \
                  ' to login.\nPage Not Found will be shown at success.\n\nEmail:'
         result = askstring('Login', prompt, initialvalue=self.email)
         if result:
@@ -701,17 +847,16 @@ class App(Tk):
             tesla = teslapy.Tesla(self.email, authenticator=self.custom_auth,
                                   verify=self.verify.get(), proxy=self.proxy,
                                   retry=retry, sso_base_url=self.sso_url)
-            # Create and start login thread. Check thread status after 100 ms
+            # Create and start login thread
             self.login_thread = LoginThread(tesla)
             self.login_thread.start()
-            self.after(100, self.process_login)
-
-    def process_login(self):
-        """ Waits for thread to finish and updates vehicle menu """
-        if self.login_thread.is_alive():
-            # Check again after 100 ms
-            self.after(100, self.process_login)
-        elif self.login_thread.exception:
+            # Disable login command
+            self.app_menu.entryconfig(0, state=DISABLED)
+
+    def process_login(self, event=None):
+        """ Handles finished login thread and updates vehicle menu """
+        self.app_menu.entryconfig(0, state=NORMAL)
+        if self.login_thread.exception:
             self.status.text(self.login_thread.exception)
         else:
             # Remove vehicles from menu
@@ -737,67 +882,70 @@ class App(Tk):
         if not hasattr(self, 'login_thread'):
             return
         # Use pywebview if available and selenium not selected
-        if webview and not self.selenium.get():
+        if has_webview and not self.selenium.get():
             # Run in separate process
             pool.apply(show_webview, (self.login_thread.tesla.logout(), ))
         # Do not sign out if selenium is available and selected
-        self.login_thread.tesla.logout(not (webdriver and self.selenium.get()))
+        self.login_thread.tesla.logout(not (has_selenium and
+                                            self.selenium.get()))
         if hasattr(self, 'vehicle'):
             del self.vehicle
-        # Redraw dashboard
-        self.dashboard.pack_forget()
-        self.dashboard = Dashboard(self)
-        self.dashboard.pack(pady=5, fill=X)
+        # Clear dashboard
+        self.dashboard.reset()
         # Remove vehicles from menu
         self.vehicle_menu.delete(4, END)
         # Disable commands
         for i in range(0, 3):
             self.vehicle_menu.entryconfig(i, state=DISABLED)
-        for i in range(0, self.cmd_menu.index(END) + 1):
-            self.cmd_menu.entryconfig(i, state=DISABLED)
-        for i in range(0, self.media_menu.index(END) + 1):
-            self.media_menu.entryconfig(i, state=DISABLED)
+        self.cmd_menu.entryconfig(0, state=DISABLED)
+        self.set_commands_state(DISABLED)
         self.status.text('Not logged in')
 
     def select(self):
         """ Select vehicle and start new thread to get vehicle image """
         self.vehicle = self.login_thread.vehicles[self.selected.get()]
-        # Create and start image thread. Check thread status after 100 ms
-        self.image_thread = ImageThread(self.vehicle)
-        self.image_thread.start()
-        self.after(100, self.process_select)
-        # Create and start service thread. Check thread status after 100 ms
-        self.service_thread = ServiceThread(self.vehicle)
+        # Use cached image if the vehicle configuration did not change
+        key = (self.vehicle['vin'], self.vehicle.get('option_codes'))
+        if key in self.images:
+            self.dashboard.vehicle_image.config(image=self.images[key])
+        elif key not in self.image_threads:
+            # Create and start image thread
+            self.image_threads[key] = ImageThread(self.vehicle)
+            self.image_threads[key].start()
+        # Create and start service thread
+        self.service_thread = TaskThread(
+            '<<ServiceDone>>', self.vehicle.get_service_scheduling_data)
         self.service_thread.start()
-        self.after(100, self.process_service)
         # Start status thread only once
         if not hasattr(self, 'status_thread'):
             self.update_status()
         self.update_dashboard()
 
-    def process_select(self):
-        """ Waits for thread to finish and displays vehicle image """
-        if self.image_thread.is_alive():
-            # Check again after 100 ms
-            self.after(100, self.process_select)
-        elif self.image_thread.exception:
-            # Handle errors
-            self.status.text(self.image_thread.exception)
-        else:
-            # Display vehicle image
-            self.dashboard.vehicle_image.config(image=self.image_thread.photo)
-
-    def process_service(self):
-        """ Waits for thread to finish and displays service data """
-        if self.service_thread.is_alive():
-            # Check again after 100 ms
-            self.after(100, self.process_service)
-        elif self.service_thread.exception:
+    def process_select(self, event=None):
+        """ Handles finished image threads and displays vehicle image """
+        selected = (self.vehicle['vin'], self.vehicle.get('option_codes'))
+        for key, thread in list(self.image_threads.items()):
+            if not thread.done:
+                continue
+            del self.image_threads[key]
+            if thread.exception:
+                # Handle errors
+                self.status.text(thread.exception)
+            elif thread.data is not None or thread.image is not None:
+                # Keep a reference to the photo
+                self.images[key] = thread.photo()
+                # Display vehicle image unless another vehicle is selected
+                if key == selected:
+                    self.dashboard.vehicle_image.config(image=self.images[key])
+
+    def process_service(self, event=None):
+        """ Handles finished service thread and displays service data """
+        if self.service_thread.exception:
             # Handle errors
             self.status.text(self.service_thread.exception)
         else:
             # Display service data
-            nat = self.service_thread.data.get('next_appt_timestamp')
+            nat = self.service_thread.result.get('next_appt_timestamp')
             # pylint: disable=E1101
             self.dashboard.next_appt.text(nat)
 
@@ -807,76 +955,134 @@ class App(Tk):
                                        self.vehicle['state']))
         self.dashboard.in_service.text(str(self.vehicle['in_service']))
         # Enable/disable commands
-        state = NORMAL if self.vehicle['state'] == 'online' else DISABLED
-        for i in range(1, self.cmd_menu.index(END) + 1):
-            if self.cmd_menu.entrycget(i, 'state') != state:
-                self.cmd_menu.entryconfig(i, state=state)
-        for i in range(0, self.media_menu.index(END) + 1):
-            if self.media_menu.entrycget(i, 'state') != state:
-                self.media_menu.entryconfig(i, state=state)
+        self.set_commands_state(NORMAL if self.vehicle['state'] == 'online'
+                                else DISABLED)
+
+    def set_commands_state(self, state):
+        """ Set state of command menu entries, except wake up, and media menu
+        entries if it has changed """
+        if state == self.commands_state:
+            return
+        self.commands_state = state
+        for i in range(1, self.cmd_menu_end + 1):
+            self.cmd_menu.entryconfig(i, state=state)
+        for i in range(0, self.media_menu_end + 1):
+            self.media_menu.entryconfig(i, state=state)
 
     def update_status(self):
         """ Creates a new thread to get vehicle summary """
-        self.status_thread = StatusThread(self.vehicle)
+        self.status_thread = TaskThread('<<StatusDone>>',
+                                        self.vehicle.get_vehicle_summary)
         # Don't start if auto refresh is enabled
         if not self.auto_refresh.get() or self.vehicle['state'] != 'online':
             self.status_thread.start()
-        self.after(100, self.process_status)
-
-    def process_status(self):
-        """ Waits for thread to finish and updates status """
-        if self.status_thread.is_alive():
-            self.after(100, self.process_status)
         else:
-            # Increase status polling rate if vehicle is online
-            delay = 60000 if self.vehicle['state'] == 'online' else 240000
-            # Run thread again and show status
-            self.after(delay, self.update_status)
-            if self.status_thread.exception:
-                self.status.text(self.status_thread.exception)
-            else:
-                self.show_status()
+            self.process_status()
+
+    def process_status(self, event=None):
+        """ Handles finished status thread and updates status """
+        # Poll more often right after a state change and back off while the
+        # state stays the same, slowest while vehicle is asleep
+        state = self.vehicle['state']
+        if state == self.last_state:
+            self.same_state_cnt = min(self.same_state_cnt + 1,
+                                      self.STATUS_STEPS)
+        else:
+            self.last_state = state
+            self.same_state_cnt = 0
+            # Resume auto refresh when vehicle has come online
+            if state == 'online' and self.auto_refresh.get():
+                self.update_dashboard()
+        high = self.STATUS_MAX_DELAY.get(state, self.STATUS_MAX_DELAY_DEFAULT)
+        delay = self.STATUS_MIN_DELAY + (high - self.STATUS_MIN_DELAY) * \
+            self.same_state_cnt // self.STATUS_STEPS
+        # Run thread again and show status
+        self.after(delay, self.update_status)
+        if self.status_thread.exception:
+            self.status.text(self.status_thread.exception)
+        else:
+            self.show_status()
 
     def update_dashboard(self, scheduled=False):
-        """ Create new thread to get vehicle data """
+        """ Coalesce refresh requests into one refresh per idle cycle """
         if scheduled:
             self.update_scheduled = False
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            self.after_idle(self.refresh_dashboard)
+
+    def delay_refresh(self, delay):
+        """ Update dashboard after delay, replacing a pending delayed update so
+        that commands issued in quick succession result in one update """
+        if self.refresh_after is not None:
+            self.after_cancel(self.refresh_after)
+        self.refresh_after = self.after(delay, self.delayed_refresh)
+
+    def delayed_refresh(self):
+        """ Run delayed dashboard update """
+        self.refresh_after = None
+        self.update_dashboard()
+
+    def resume_dashboard(self, event):
+        """ Run update held while window was minimized """
+        if event.widget is self and self.update_paused:
+            self.update_paused = False
+            self.update_dashboard()
+
+    def refresh_dashboard(self):
+        """ Request vehicle data from worker thread """
+        self.refresh_pending = False
         if hasattr(self, 'vehicle') and self.vehicle['state'] != 'online':
             return
-        # pylint: disable=E0203
-        if hasattr(self, 'update_thread') and self.update_thread.is_alive():
+        if self.update_pending:
             return
         if hasattr(self, 'vehicle') and not self.update_scheduled:
+            # Hold update while window is minimized until it is mapped again
+            if self.state() == 'iconic':
+                self.update_paused = True
+                return
             self.show_status()
-            self.update_thread = UpdateThread(self.vehicle)
-            self.update_thread.start()
-            self.after(100, self.process_update_dashboard)
-
-    def process_update_dashboard(self):
-        """ Waits for thread to finish and updates dashboard data """
-        if self.update_thread.is_alive():
-            self.after(100, self.process_update_dashboard)
+            self.update_pending = True
+            self.update_thread.requests.put(self.vehicle)
+
+    def process_update_dashboard(self, event=None):
+        """ Handles worker result and updates dashboard data """
+        try:
+            exception = self.update_results.get_nowait()
+        except queue.Empty:
             return
+        self.update_pending = False
         try:
-            delay = 4000  # Default update polling rate
-            if self.update_thread.exception:
-                self.status.text(self.update_thread.exception)
+            delay = self.update_delay.get()
+            fail_cnt = self.update_thread.fail_cnt
+            if exception:
+                self.status.text(exception)
                 self.status.indicator('red')
+                # Back off exponentially on consecutive failures
+                delay = min(delay * 2 ** fail_cnt, self.UPDATE_MAX_DELAY)
             else:
-                timestamp_ms = self.vehicle['vehicle_state']['timestamp']
-                self.status.status(time.ctime(timestamp_ms / 1000))
+                vs = self.vehicle['vehicle_state']
+                timestamp_ms = vs['timestamp']
+                if timestamp_ms != self.timestamp:
+                    self.timestamp = timestamp_ms
+                    self.status.status(time.ctime(timestamp_ms / 1000))
                 self.status.indicator('green')
                 self.dashboard.update_widgets()
-                # Increase polling rate if charging or user present
-                if (self.vehicle['charge_state']['charging_state'] == 'Charging'
-                        or self.vehicle['vehicle_state']['is_user_present']):
-                    delay = 1000
+                # Increase polling rate if driving, charging or user present
+                charging_state = self.vehicle['charge_state']['charging_state']
+                if charging_state == 'Charging' or vs['is_user_present'] or \
+                        self.vehicle['drive_state']['shift_state']:
+                    delay = self.UPDATE_FAST_DELAY
             # Run again if auto refresh is on and fail threshold is not exceeded
-            if self.auto_refresh.get() and self.update_thread.fail_cnt < 10:
-                self.after(delay, self.update_dashboard, True)
-                self.update_scheduled = True
+            auto_refresh = self.auto_refresh.get()
+            if auto_refresh and fail_cnt < 10:
+                # Leave it to status polling while vehicle is not online
+                if self.vehicle['state'] == 'online':
+                    self.after(delay, self.update_dashboard, True)
+                    self.update_scheduled = True
             else:
-                self.auto_refresh.set(FALSE)
+                if auto_refresh:
+                    self.auto_refresh.set(FALSE)
                 self.status.indicator(None)
         except Exception as e:
             # On error turn off auto refresh and re-raise
@@ -889,17 +1095,15 @@ class App(Tk):
     def wake_up(self):
         """ Creates a new thread to wake up vehicle """
         self.status.text('Please wait...')
-        self.wake_up_thread = WakeUpThread(self.vehicle)
+        self.wake_up_thread = TaskThread('<<WakeUpDone>>',
+                                         self.vehicle.sync_wake_up)
         self.wake_up_thread.start()
-        self.after(100, self.process_wake_up)
         # Disable wake up command
         self.cmd_menu.entryconfig(0, state=DISABLED)
 
-    def process_wake_up(self):
-        """ Waits for thread to finish and updates widgets """
-        if self.wake_up_thread.is_alive():
-            self.after(100, self.process_wake_up)
-        elif self.wake_up_thread.exception:
+    def process_wake_up(self, event=None):
+        """ Handles finished wake up thread and updates widgets """
+        if self.wake_up_thread.exception:
             self.status.text(self.wake_up_thread.exception)
             self.cmd_menu.entryconfig(0, state=NORMAL)
         else:
@@ -910,71 +1114,74 @@ class App(Tk):
     def about(self):
         """ Show about dialog """
         LabelGridDialog(self, 'About',
-                        [{'text': 'Tesla Owner API Python GUI by Tim Dorssers'},
-                         {'text': 'Tcl/Tk toolkit version %s' % TkVersion}])
+                        [Cell('Tesla Owner API Python GUI by Tim Dorssers'),
+                         Cell('Tcl/Tk toolkit version %s' % TkVersion)])
 
     def option_codes(self):
         """ Show vehicle option codes in a dialog """
-        table = []
-        for i, item in enumerate(self.vehicle.option_code_list()):
-            table.append(dict(text=item, row=i // 2, column=i % 2, sticky=W))
-        LabelGridDialog(self, 'Option codes', table)
+        key = ('Option codes', self.vehicle['vin'])
+        if key not in self.tables:
+            table = []
+            for i, item in enumerate(self.vehicle.option_code_list()):
+                table.append(Cell(text=item, row=i // 2, column=i % 2,
+                                  sticky=W))
+            self.tables[key] = table
+        LabelGridDialog(self, 'Option codes', self.tables[key])
 
     def decode_vin(self):
         """ Show decoded vin in a dialog """
-        table = []
-        for i, item in enumerate(self.vehicle.decode_vin().items()):
-            table.append(dict(text=item[0] + ':', row=i, sticky=E))
-            table.append(dict(text=item[1], row=i, column=1, sticky=W))
-        LabelGridDialog(self, 'Decode VIN', table)
+        key = ('Decode VIN', self.vehicle['vin'])
+        if key not in self.tables:
+            table = []
+            for i, item in enumerate(self.vehicle.decode_vin().items()):
+                table.append(Cell(text=item[0] + ':', row=i, sticky=E))
+                table.append(Cell(text=item[1], row=i, column=1, sticky=W))
+            self.tables[key] = table
+        LabelGridDialog(self, 'Decode VIN', self.tables[key])
 
     def charging_sites(self):
         """ Creates a new thread to get nearby charging sites """
         self.status.text('Please wait...')
-        self.nearby_sites_thread = NearbySitesThread(self.vehicle)
+        self.nearby_sites_thread = TaskThread(
+            '<<NearbySitesDone>>', self.vehicle.get_nearby_charging_sites)
         self.nearby_sites_thread.start()
-        self.after(100, self.process_charging_sites)
 
-    def process_charging_sites(self):
-        """ Waits for thread to finish and displays sites in a dialog box """
-        if self.nearby_sites_thread.is_alive():
-            self.after(100, self.process_charging_sites)
-        elif self.nearby_sites_thread.exception:
+    def process_charging_sites(self, event=None):
+        """ Handles finished thread and displays sites in a dialog box """
+        if self.nearby_sites_thread.exception:
             self.status.text(self.nearby_sites_thread.exception)
         else:
             self.show_status()
             # Prepare list of label and grid attributes for table view
-            table = [dict(text='Destination Charging:', columnspan=2)]
+            table = [Cell(text='Destination Charging:', columnspan=2)]
             r = 1
-            for site in self.nearby_sites_thread.sites['destination_charging']:
-                table.append(dict(text=site['name'], row=r, sticky=W))
+            for site in self.nearby_sites_thread.result['destination_charging']:
+                table.append(Cell(text=site['name'], row=r, sticky=W))
                 dist = self.vehicle.dist_units(site['distance_miles'])
-                table.append(dict(text=dist, row=r, column=1, sticky=W))
+                table.append(Cell(text=dist, row=r, column=1, sticky=W))
                 r += 1
-            table.append(dict(text='Superchargers:', row=r, columnspan=2))
+            table.append(Cell(text='Superchargers:', row=r, columnspan=2))
             r += 1
-            for site in self.nearby_sites_thread.sites['superchargers']:
-                table.append(dict(text=site['name'], row=r, sticky=W))
+            for site in self.nearby_sites_thread.result['superchargers']:
+                table.append(Cell(text=site['name'], row=r, sticky=W))
                 dist = self.vehicle.dist_units(site['distance_miles'])
-                table.append(dict(text=dist, row=r, column=1, sticky=W))
+                table.append(Cell(text=dist, row=r, column=1, sticky=W))
                 text = '%d/%d free stalls' % (site['available_stalls'],
                                               site['total_stalls'])
-                table.append(dict(text=text, row=r, column=2, sticky=W))
+                table.append(Cell(text=text, row=r, column=2, sticky=W))
                 r += 1
             LabelGridDialog(self, 'Nearby Charging Sites', table)
 
     def charge_history(self):
         """ Creates a new thread to get charging history """
         self.status.text('Please wait...')
-        self.charge_history_thread = ChargeHistoryThread(self.vehicle)
+        self.charge_history_thread = TaskThread(
+            '<<ChargeHistoryDone>>', self.vehicle.get_charge_history)
         self.charge_history_thread.start()
-        self.after(100, self.process_charge_history)
         
-    def process_charge_history(self):
-        """ Waits for thread to finish and displays history in a dialog box """
-        if self.charge_history_thread.is_alive():
-            self.after(100, self.process_charge_history)
-        elif self.charge_history_thread.exception:
+    def process_charge_history(self, event=None):
+        """ Handles finished thread and displays history in a dialog box """
+        if self.charge_history_thread.exception:
             self.status.text(self.charge_history_thread.exception)
         else:
             self.show_status()
@@ -983,20 +1190,18 @@ class App(Tk):
     def cmd(self, name, **kwargs):
         """ Creates a new thread to command vehicle """
         self.status.text('Please wait...')
-        self.command_thread = CommandThread(self.vehicle, name, **kwargs)
+        self.command_thread = TaskThread('<<CommandDone>>',
+                                         self.vehicle.command, name, **kwargs)
         self.command_thread.start()
-        self.after(100, self.process_cmd)
 
-    def process_cmd(self):
-        """ Waits for thread to finish and update widgets """
-        if self.command_thread.is_alive():
-            self.after(100, self.process_cmd)
-        elif self.command_thread.exception:
+    def process_cmd(self, event=None):
+        """ Handles finished command thread and update widgets """
+        if self.command_thread.exception:
             self.status.text(self.command_thread.exception)
         else:
             # Update dashboard after 1 second if auto refresh is disabled
             if not self.auto_refresh.get():
-                self.after(1000, self.update_dashboard)
+                self.delay_refresh(1000)
 
     def lock_unlock(self):
         """ Lock or unlock vehicle """
@@ -1103,12 +1308,13 @@ class App(Tk):
         logging.getLogger().setLevel(level)
         # Set Nominatim SSL verify
         if self.verify.get():
-            geopy.geocoders.options.default_ssl_context = None
+            UpdateThread.ssl_context = None
         else:
+            import ssl
             ctx = ssl.create_default_context()
             ctx.check_hostname = False
             ctx.verify_mode = ssl.CERT_NONE
-            geopy.geocoders.options.default_ssl_context = ctx
+            UpdateThread.ssl_context = ctx
 
     def set_proxy(self):
         """ Set proxy server URL """
@@ -1122,38 +1328,108 @@ class App(Tk):
 
     def save_and_quit(self):
         """ Save settings to file and quit app """
-        config = RawConfigParser()
-        config.add_section('app')
-        config.add_section('display')
         try:
-            config.set('app', 'email', self.email)
-            config.set('app', 'proxy', self.proxy)
-            config.set('app', 'verify', self.verify.get())
-            config.set('app', 'sso_url', self.sso_url)
-            config.set('app', 'browser', self.browser.get())
-            config.set('app', 'selenium', self.selenium.get())
-            config.set('display', 'auto_refresh', self.auto_refresh.get())
-            config.set('display', 'debug', self.debug.get())
-            with open('gui.ini', 'w') as configfile:
-                config.write(configfile)
+            app_options = OrderedDict([('email', self.email),
+                                       ('proxy', self.proxy),
+                                       ('verify', self.verify.get()),
+                                       ('sso_url', self.sso_url),
+                                       ('browser', self.browser.get()),
+                                       ('selenium', self.selenium.get())])
+            display_options = {'auto_refresh': self.auto_refresh.get(),
+                               'debug': self.debug.get(),
+                               'update_delay': self.update_delay.get()}
+            write_ini('gui.ini', OrderedDict([('app', app_options),
+                                              ('display', display_options)]))
         except (IOError, AttributeError):
             pass
         finally:
             self.quit()
 
-class UpdateThread(threading.Thread):
-    """ Retrieves vehicle data and looks up address if coordinates change """
+class EventThread(threading.Thread):
+    """ Base class for threads that generate a virtual event on the application
+    window when the task is finished, instead of having the main thread poll
+    whether the thread is still alive """
 
-    _coords = None
-    location = None
-    fail_cnt = 0
+    event = None
 
-    def __init__(self, vehicle):
-        threading.Thread.__init__(self)
-        self.vehicle = vehicle
+    def run(self):
+        try:
+            self.task()
+        finally:
+            self.notify()
+
+    def task(self):
+        """ Work to be done by the thread, overridden by subclasses """
+        pass
+
+    def notify(self):
+        """ Signal main thread that the task is finished """
+        try:
+            app.event_generate(self.event, when='tail')
+        except (TclError, RuntimeError):
+            pass  # Application has been closed
+
+class TaskThread(EventThread):
+    """ Call function with arguments and save the result or exception """
+
+    def __init__(self, event, func, *args, **kwargs):
+        EventThread.__init__(self)
+        self.event = event
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.exception = None
+        self.result = None
+
+    def task(self):
+        try:
+            self.result = self.func(*self.args, **self.kwargs)
+        except (teslapy.VehicleError, teslapy.RequestException, ValueError) as e:
+            self.exception = e
+
+class UpdateThread(EventThread):
+    """ Retrieves vehicle data and looks up address if coordinates change. Runs
+    as a worker that takes vehicles from the requests queue and puts the
+    exception, or None on success, in the results queue. """
+
+    event = '<<UpdateDone>>'
+    addresses = OrderedDict()  # LRU cache of addresses by rounded coordinates
+    ADDRESS_CACHE_SIZE = 512
+    ADDRESS_DB = 'geocode.db'  # Addresses of previous runs by coordinates
+    GEOCODE_TIMEOUT = 5  # Seconds to wait for address lookup
+    GEOCODE_RETRY_DELAY = 30  # Seconds before retrying a timed out lookup
+    ssl_context = None  # Nominatim SSL context, None to verify certificates
+
+    def __init__(self, results):
+        EventThread.__init__(self)
+        self.daemon = True
+        self.requests = queue.Queue()
+        self.results = results
+        self.vehicle = None
         self.exception = None
+        self.coords = None  # Coordinates of last address lookup
+        self.location = None
+        self.retry_time = None  # Time to retry timed out address lookup
+        self.fail_cnt = 0  # Consecutive errors
+        self.osm = None  # Geocoder, reused to keep the connection alive
+        self.osm_settings = None  # SSL context and proxies of geocoder
+        self.db = None  # Address database connection, owned by this thread
 
     def run(self):
+        while True:
+            self.vehicle = self.requests.get()
+            self.exception = None
+            # Keep the worker alive, as no update would be done otherwise
+            try:
+                self.update()
+            except Exception as e:
+                self.exception = e
+            finally:
+                self.results.put(self.exception)
+                self.notify()
+
+    def update(self):
+        """ Get vehicle data and lookup address """
         try:
             self.vehicle.get_vehicle_data()
         except (teslapy.RequestException, ValueError) as e:
@@ -1162,162 +1438,150 @@ class UpdateThread(threading.Thread):
                 self.vehicle.get_vehicle_summary()
             except (teslapy.RequestException, ValueError) as e:
                 pass
-            UpdateThread.fail_cnt += 1  # Increase for consecutive errors
+            self.fail_cnt += 1  # Increase for consecutive errors
             self.exception = e
         else:
-            coords = '%s, %s' % (self.vehicle['drive_state']['latitude'],
-                                 self.vehicle['drive_state']['longitude'])
-            # Have coordinates changed over previous instance?
-            if self._coords != coords:
-                UpdateThread._coords = coords
+            from geopy.exc import (GeocoderTimedOut, GeocoderUnavailable,
+                                   GeopyError)
+            lat = self.vehicle['drive_state']['latitude']
+            lon = self.vehicle['drive_state']['longitude']
+            coords = (lat, lon)
+            # Have coordinates changed since last lookup or is a retry due?
+            retry = self.retry_time and time.time() >= self.retry_time
+            if self.coords != coords or retry:
+                self.coords = coords
+                self.retry_time = None
                 # Fallback to coordinates if lookup fails
-                self.location = coords
+                self.location = '%s, %s' % coords
                 try:
-                    # Lookup address at coordinates
-                    osm = Nominatim(user_agent='TeslaPy',
-                                    proxies=self.vehicle.tesla.proxies)
-                    self.location = osm.reverse(coords).address
+                    self.location = self.reverse(round(lat, 4), round(lon, 4))
                 except (GeocoderTimedOut, GeocoderUnavailable):
-                    UpdateThread._coords = None  # Force lookup
+                    # Retry later instead of on every update
+                    self.retry_time = time.time() + self.GEOCODE_RETRY_DELAY
                 except GeopyError as e:
-                    UpdateThread._coords = None
-                    UpdateThread.fail_cnt += 1
+                    self.coords = None
+                    self.fail_cnt += 1
                     self.exception = e
-                finally:
-                    UpdateThread.location = self.location  # Save location
-            UpdateThread.fail_cnt = 0
-
-class WakeUpThread(threading.Thread):
-    """ Wake vehicle up """
-
-    def __init__(self, vehicle):
-        threading.Thread.__init__(self)
-        self.vehicle = vehicle
-        self.exception = None
+            self.fail_cnt = 0
 
-    def run(self):
+    def reverse(self, lat, lon):
+        """ Lookup address at coordinates, rounded to about 10 meters, using
+        a least recently used cache backed by a database """
+        key = (lat, lon)
         try:
-            self.vehicle.sync_wake_up()
-        except (teslapy.VehicleError, teslapy.RequestException) as e:
-            self.exception = e
-
-class ImageThread(threading.Thread):
+            address = self.addresses.pop(key)
+        except KeyError:
+            address = self.load_address(key)
+            if address is None:
+                osm = self.geocoder()
+                location = osm.reverse('%s, %s' % key,
+                                       timeout=self.GEOCODE_TIMEOUT)
+                if location is None:
+                    return '%s, %s' % key  # No address found, don't cache
+                address = location.address
+                self.store_address(key, address)
+            if len(self.addresses) >= self.ADDRESS_CACHE_SIZE:
+                self.addresses.popitem(last=False)  # Evict oldest entry
+        self.addresses[key] = address  # Mark as most recently used
+        return address
+
+    def load_address(self, key):
+        """ Return address at coordinates from database or None if unknown """
+        try:
+            if self.db is None:
+                self.db = sqlite3.connect(self.ADDRESS_DB)
+                self.db.execute('CREATE TABLE IF NOT EXISTS addresses (lat '
+                                'REAL, lon REAL, address TEXT, PRIMARY KEY '
+                                '(lat, lon))')
+            row = self.db.execute('SELECT address FROM addresses WHERE lat = ?'
+                                  ' AND lon = ?', key).fetchone()
+        except sqlite3.Error:
+            logging.warning('Cannot load address: %s', self.ADDRESS_DB,
+                            exc_info=True)
+            return None
+        return row[0] if row else None
+
+    def store_address(self, key, address):
+        """ Save address at coordinates to database """
+        if self.db is None:
+            return
+        try:
+            with self.db:
+                self.db.execute('INSERT OR REPLACE INTO addresses VALUES '
+                                '(?, ?, ?)', key + (address, ))
+        except sqlite3.Error:
+            logging.error('Address not stored: %s', self.ADDRESS_DB)
+
+    def geocoder(self):
+        """ Return Nominatim instance, which is only recreated when the SSL
+        context or proxies have changed """
+        settings = (self.ssl_context, dict(self.vehicle.tesla.proxies))
+        if self.osm is None or self.osm_settings != settings:
+            from geopy.geocoders import Nominatim
+            self.osm = Nominatim(user_agent='TeslaPy', proxies=settings[1],
+                                 ssl_context=settings[0])
+            self.osm_settings = settings
+        return self.osm
+
+class ImageThread(EventThread):
     """ Compose vehicle image """
 
+    event = '<<ImageDone>>'
+
     def __init__(self, vehicle):
-        threading.Thread.__init__(self)
+        EventThread.__init__(self)
         self.vehicle = vehicle
         self.exception = None
-        self.photo = None
+        self.data = None
+        self.image = None
+        self.done = False  # Set before the event is generated
 
-    def run(self):
+    def task(self):
         try:
             response = self.vehicle.compose_image(size=300)
         except teslapy.RequestException as e:
             self.exception = e
         else:
             # Tk 8.6 has native PNG support, older Tk require PIL
-            try:
+            if TkVersion >= 8.6:
                 import base64
-                self.photo = PhotoImage(data=base64.b64encode(response))
-            except TclError:
-                from PIL import Image, ImageTk
+                self.data = base64.b64encode(response)
+            else:
+                from PIL import Image
                 import io
-                self.photo = ImageTk.PhotoImage(Image.open(io.BytesIO(response)))
+                self.image = Image.open(io.BytesIO(response))
+                self.image.load()  # Decode in this thread
+        finally:
+            self.done = True
 
-class LoginThread(threading.Thread):
+    def photo(self):
+        """ Create photo image, must be called from the main thread """
+        if self.image is None:
+            return PhotoImage(data=self.data)
+        from PIL import ImageTk
+        return ImageTk.PhotoImage(self.image)
+
+class LoginThread(EventThread):
     """ Authenticate and retrieve vehicle list """
 
+    event = '<<LoginDone>>'
+
     def __init__(self, tesla):
-        threading.Thread.__init__(self)
+        EventThread.__init__(self)
         self.tesla = tesla
         self.exception = None
         self.vehicles = []
 
-    def run(self):
+    def task(self):
         try:
             self.tesla.fetch_token()
             self.vehicles = self.tesla.vehicle_list()
         except Exception as e:
             self.exception = str(e).replace('\n', '')
 
-class StatusThread(threading.Thread):
-    """ Retrieve vehicle status summary """
-
-    def __init__(self, vehicle):
-        threading.Thread.__init__(self)
-        self.vehicle = vehicle
-        self.exception = None
-
-    def run(self):
-        try:
-            self.vehicle.get_vehicle_summary()
-        except (teslapy.RequestException, ValueError) as e:
-            self.exception = e
-
-class CommandThread(threading.Thread):
-    """ Send vehicle command """
-
-    def __init__(self, vehicle, name, **kwargs):
-        threading.Thread.__init__(self)
-        self.vehicle = vehicle
-        self.name = name
-        self.data = kwargs
-        self.exception = None
-
-    def run(self):
-        try:
-            self.vehicle.command(self.name, **self.data)
-        except (teslapy.VehicleError, teslapy.RequestException, ValueError) as e:
-            self.exception = e
-
-class NearbySitesThread(threading.Thread):
-    """ Retrieve nearby charging sites """
-
-    def __init__(self, vehicle):
-        threading.Thread.__init__(self)
-        self.vehicle = vehicle
-        self.exception = None
-        self.sites = None
-
-    def run(self):
-        try:
-            self.sites = self.vehicle.get_nearby_charging_sites()
-        except (teslapy.RequestException, ValueError) as e:
-            self.exception = e
-
-class ServiceThread(threading.Thread):
-    """ Retrieve next service appointment """
-
-    def __init__(self, vehicle):
-        threading.Thread.__init__(self)
-        self.vehicle = vehicle
-        self.exception = None
-        self.data = None
-
-    def run(self):
-        try:
-            self.data = self.vehicle.get_service_scheduling_data()
-        except (teslapy.RequestException, ValueError) as e:
-            self.exception = e
-
-class ChargeHistoryThread(threading.Thread):
-    """ Retrieve charging history """
-
-    def __init__(self, vehicle):
-        threading.Thread.__init__(self)
-        self.vehicle = vehicle
-        self.exception = None
-        self.result = None
-
-    def run(self):
-        try:
-            self.result = self.vehicle.get_charge_history()
-        except (teslapy.RequestException, ValueError) as e:
-            self.exception = e
-
 if __name__ == "__main__":
-    pool = multiprocessing.Pool(1)
+    # Fork process to run pywebview in before any thread or window exists
+    pool = multiprocessing.Pool(1) if has_webview else None
     app = App()
     app.mainloop()
     app.destroy()
@@ -4,11 +4,12 @@
 
 from __future__ import print_function
 import ssl
+import time
+import sqlite3
 import logging
 import argparse
-import geopy.geocoders  # 1.14.0 or higher required
-from geopy.geocoders import Nominatim
-from geopy.exc import *
+import threading
+# Geopy 1.14.0 or higher is required, but only imported when used
 try:
     import webview  # Optional pywebview 3.0 or higher
 except ImportError:
@@ -22,10 +23,73 @@ except ImportError:
 from teslapy import Tesla
 
 raw_input = vars(__builtins__).get('raw_input', input)  # Py2/3 compatibility
+osm = None  # Nominatim instance, reused to keep the connection alive
+last_lookup = 0  # Time of last Nominatim request
+addresses = {}  # Addresses by coordinates rounded to about 10 meters
+db = None  # Database of addresses, to keep them across runs
+ADDRESS_DB = 'geocode.db'
+DOOR = {0: 'Closed', 1: 'Open'}
+WINDOW = {0: 'Closed', 1: 'Venting', 2: 'Open'}
+COMPASS = ('N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE', 'S', 'SSW', 'SW',
+           'WSW', 'W', 'WNW', 'NW', 'NNW')
 
 def heading_to_str(deg):
-    return ['NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE', 'S', 'SSW', 'SW', 'WSW',
-           'W', 'WNW', 'NW', 'NNW', 'N'][int(abs((deg - 11.25) % 360) / 22.5)]
+    return COMPASS[int((deg + 11.25) % 360 // 22.5)]
+
+def reverse(vehicle, lat, lon):
+    global osm, last_lookup
+    key = (round(lat, 4), round(lon, 4))
+    # Lookup address only if it is not known yet
+    if key not in addresses:
+        if osm is None:
+            from geopy.geocoders import Nominatim
+            osm = Nominatim(user_agent='TeslaPy',
+                            proxies=vehicle.tesla.proxies)
+        # Nominatim usage policy allows at most one request per second
+        delay = last_lookup + 1 - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        last_lookup = time.time()
+        location = osm.reverse('%s, %s' % key, timeout=15)
+        if location is None:
+            return '%s, %s' % key  # No address found, don't store
+        addresses[key] = location.address
+    return addresses[key]
+
+def load_address(key):
+    global db
+    try:
+        # Open database on first use
+        if db is None:
+            db = sqlite3.connect(ADDRESS_DB)
+            db.execute('CREATE TABLE IF NOT EXISTS addresses (lat REAL, '
+                       'lon REAL, address TEXT, PRIMARY KEY (lat, lon))')
+        row = db.execute('SELECT address FROM addresses WHERE lat = ? AND '
+                         'lon = ?', key).fetchone()
+    except sqlite3.Error:
+        logging.warning('Cannot load address: %s', ADDRESS_DB, exc_info=True)
+        return None
+    return row[0] if row else None
+
+def store_address(key):
+    if db is None or key not in addresses:
+        return
+    try:
+        with db:
+            db.execute('INSERT OR REPLACE INTO addresses VALUES (?, ?, ?)',
+                       key + (addresses[key], ))
+    except sqlite3.Error:
+        logging.error('Address not stored')
+
+def lookup(vehicle, result):
+    dr = vehicle['drive_state']
+    # Fallback to coordinates if lookup fails
+    result.append('%s, %s' % (dr['latitude'], dr['longitude']))
+    from geopy.exc import GeopyError
+    try:
+        result[0] = reverse(vehicle, dr['latitude'], dr['longitude'])
+    except GeopyError as e:
+        logging.error(e)
 
 def show_vehicle_data(vehicle):
     cl = vehicle['climate_state']
@@ -33,96 +97,107 @@ def show_vehicle_data(vehicle):
     dr = vehicle['drive_state']
     ch = vehicle['charge_state']
     co = vehicle['vehicle_config']
-    # Lookup address at coordinates
-    coords = '%s, %s' % (dr['latitude'], dr['longitude'])
-    try:
-        osm = Nominatim(user_agent='TeslaPy', proxies=vehicle.tesla.proxies)
-        location = osm.reverse(coords).address
-    except (GeocoderTimedOut, GeocoderUnavailable) as e:
-        logging.error(e)
-        location = coords
+    lines = []
+    add = lines.append
+    # Lookup address at coordinates while formatting preceding data, unless
+    # it is already known, such as when the vehicle is parked
+    thread = None
+    key = (round(dr['latitude'], 4), round(dr['longitude'], 4))
+    if key not in addresses:
+        address = load_address(key)
+        if address is not None:
+            addresses[key] = address
+    if key in addresses:
+        location = [addresses[key]]
+    else:
+        location = []
+        thread = threading.Thread(target=lookup, args=(vehicle, location))
+        thread.daemon = True
+        thread.start()
     # Climate state
     fmt = 'Outside Temperature: {:17} Inside Temperature: {}'
-    print(fmt.format(vehicle.temp_units(cl['outside_temp']),
-                     vehicle.temp_units(cl['inside_temp'])))
+    add(fmt.format(vehicle.temp_units(cl['outside_temp']),
+                   vehicle.temp_units(cl['inside_temp'])))
     fmt = 'Driver Temperature Setting: {:10} Passenger Temperature Setting: {}'
-    print(fmt.format(vehicle.temp_units(cl['driver_temp_setting']),
-                     vehicle.temp_units(cl['passenger_temp_setting'])))
+    add(fmt.format(vehicle.temp_units(cl['driver_temp_setting']),
+                   vehicle.temp_units(cl['passenger_temp_setting'])))
     fmt = 'Is Climate On: {:23} Fan Speed: {}'
-    print(fmt.format(str(cl['is_climate_on']), cl['fan_status']))
+    add(fmt.format(str(cl['is_climate_on']), cl['fan_status']))
     fmt = 'Driver Seat Heater: {:18} Passenger Seat Heater: {}'
-    print(fmt.format(str(cl['seat_heater_left']), str(cl['seat_heater_right'])))
+    add(fmt.format(str(cl['seat_heater_left']), str(cl['seat_heater_right'])))
     fmt = 'Is Front Defroster On: {:15} Is Rear Defroster On: {}'
-    print(fmt.format(str(cl['is_front_defroster_on']),
-                     str(cl['is_rear_defroster_on'])))
-    print('-' * 80)
+    add(fmt.format(str(cl['is_front_defroster_on']),
+                   str(cl['is_rear_defroster_on'])))
+    add('-' * 80)
     # Vehicle state
     fmt = 'Vehicle Name: {:24} Odometer: {}'
-    print(fmt.format(str(ve['vehicle_name']), vehicle.dist_units(ve['odometer'])))
+    add(fmt.format(str(ve['vehicle_name']), vehicle.dist_units(ve['odometer'])))
     fmt = 'Car Version: {:25} Locked: {}'
-    print(fmt.format(ve['car_version'], ve['locked']))
-    door = {0: 'Closed', 1: 'Open'}
+    add(fmt.format(ve['car_version'], ve['locked']))
     fmt = 'Driver/Pass Front Door: {:14} Driver/Pass Rear Door: {}/{}'
-    print(fmt.format('%s/%s' % (door.get(ve['df']), door.get(ve['pf'])),
-                     door.get(ve['dr']), door.get(ve['pr'])))
-    window = {0: 'Closed', 1: 'Venting', 2: 'Open'}
+    add(fmt.format('%s/%s' % (DOOR.get(ve['df']), DOOR.get(ve['pf'])),
+                   DOOR.get(ve['dr']), DOOR.get(ve['pr'])))
     fmt = 'Drvr/Pass Front Window: {:14} Driver/Pass Rear Window: {}/{}'
-    print(fmt.format('%s/%s' % (window.get(ve.get('fd_window')),
-                                window.get(ve.get('fp_window'))),
-                     window.get(ve.get('rd_window')),
-                     window.get(ve.get('rp_window'))))
+    add(fmt.format('%s/%s' % (WINDOW.get(ve.get('fd_window')),
+                              WINDOW.get(ve.get('fp_window'))),
+                   WINDOW.get(ve.get('rd_window')),
+                   WINDOW.get(ve.get('rp_window'))))
     fmt = 'Front Trunk: {:25} Rear Trunk: {}'
-    print(fmt.format(door.get(ve['ft']), door.get(ve['rt'])))
+    add(fmt.format(DOOR.get(ve['ft']), DOOR.get(ve['rt'])))
     fmt = 'Remote Start: {:24} Is User Present: {}'
-    print(fmt.format(str(ve['remote_start']), str(ve['is_user_present'])))
+    add(fmt.format(str(ve['remote_start']), str(ve['is_user_present'])))
     fmt = 'Speed Limit Mode: {:20} Current Limit: {}'
     limit = vehicle.dist_units(ve['speed_limit_mode']['current_limit_mph'], True)
-    print(fmt.format(str(ve['speed_limit_mode']['active']), limit))
+    add(fmt.format(str(ve['speed_limit_mode']['active']), limit))
     fmt = 'Speed Limit Pin Set: {:17} Sentry Mode: {}'
-    print(fmt.format(str(ve['speed_limit_mode']['pin_code_set']),
-                     str(ve.get('sentry_mode'))))
+    add(fmt.format(str(ve['speed_limit_mode']['pin_code_set']),
+                   str(ve.get('sentry_mode'))))
     fmt = 'Valet Mode: {:26} Valet Pin Set: {}'
-    print(fmt.format(str(ve['valet_mode']), str(not 'valet_pin_needed' in ve)))
-    print('-' * 80)
+    add(fmt.format(str(ve['valet_mode']), str(not 'valet_pin_needed' in ve)))
+    add('-' * 80)
     # Drive state
     speed = 0 if dr['speed'] is None else dr['speed']
     fmt = 'Power: {:31} Speed: {}'
-    print(fmt.format(str(dr['power']) + ' kW', vehicle.dist_units(speed, True)))
+    add(fmt.format(str(dr['power']) + ' kW', vehicle.dist_units(speed, True)))
     fmt = 'Shift State: {:25} Heading: {}'
-    print(fmt.format(str(dr['shift_state']), heading_to_str(dr['heading'])))
-    print(u'GPS: {:.75}'.format(location))
-    print('-' * 80)
+    add(fmt.format(str(dr['shift_state']), heading_to_str(dr['heading'])))
+    if thread:
+        thread.join()
+        store_address(key)
+    add(u'GPS: {:.75}'.format(location[0]))
+    add('-' * 80)
     # Charging state
-    fmt = 'Charging State: {:22} Time To Full Charge: {:02.0f}:{:02.0f}'
-    print(fmt.format(ch['charging_state'],
-                     *divmod(ch['time_to_full_charge'] * 60, 60)))
+    fmt = 'Charging State: {:22} Time To Full Charge: {:02d}:{:02d}'
+    minutes = int(round(ch['time_to_full_charge'] * 60))
+    add(fmt.format(ch['charging_state'], *divmod(minutes, 60)))
     phases = '3 x ' if ch['charger_phases'] == 2 else ''
     fmt = 'Charger Voltage: {:21} Charger Actual Current: {}{:d} A'
-    print(fmt.format(str(ch['charger_voltage']) + ' V',
-                     phases, ch['charger_actual_current']))
+    add(fmt.format(str(ch['charger_voltage']) + ' V',
+                   phases, ch['charger_actual_current']))
     fmt = 'Charger Power: {:23} Charge Rate: {}'
-    print(fmt.format(str(ch['charger_power']) + ' kW',
-                     vehicle.dist_units(ch['charge_rate'], True)))
+    add(fmt.format(str(ch['charger_power']) + ' kW',
+                   vehicle.dist_units(ch['charge_rate'], True)))
     fmt = 'Battery Level: {:23} Battery Range: {}'
-    print(fmt.format(str(ch['battery_level']) + ' %',
-                     vehicle.dist_units(ch['battery_range'])))
+    add(fmt.format(str(ch['battery_level']) + ' %',
+                   vehicle.dist_units(ch['battery_range'])))
     fmt = 'Charge Energy Added: {:17} Charge Range Added: {}'
-    print(fmt.format(str(ch['charge_energy_added']) + ' kWh',
-                     vehicle.dist_units(ch['charge_miles_added_rated'])))
+    add(fmt.format(str(ch['charge_energy_added']) + ' kWh',
+                   vehicle.dist_units(ch['charge_miles_added_rated'])))
     fmt = 'Charge Limit SOC: {:20} Estimated Battery Range: {}'
-    print(fmt.format(str(ch['charge_limit_soc']) + ' %',
-                     vehicle.dist_units(ch['est_battery_range'])))
+    add(fmt.format(str(ch['charge_limit_soc']) + ' %',
+                   vehicle.dist_units(ch['est_battery_range'])))
     fmt = 'Charge Port Door Open: {:15} Charge Port Latch: {}'
-    print(fmt.format(str(ch['charge_port_door_open']),
-                     str(ch['charge_port_latch'])))
-    print('-' * 80)
+    add(fmt.format(str(ch['charge_port_door_open']),
+                   str(ch['charge_port_latch'])))
+    add('-' * 80)
     # Vehicle config
     fmt = 'Car Type: {:28} Exterior Color: {}'
-    print(fmt.format(co['car_type'], co['exterior_color']))
+    add(fmt.format(co['car_type'], co['exterior_color']))
     fmt = 'Wheel Type: {:26} Spoiler Type: {}'
-    print(fmt.format(co['wheel_type'], co['spoiler_type']))
+    add(fmt.format(co['wheel_type'], co['spoiler_type']))
     fmt = 'Roof Color: {:26} Charge Port Type: {}'
-    print(fmt.format(co['roof_color'], co['charge_port_type']))
+    add(fmt.format(co['roof_color'], co['charge_port_type']))
+    print('\n'.join(lines))
 
 def show_charging_sites(vehicle):
     sites = vehicle.get_nearby_charging_sites()
@@ -158,13 +233,103 @@ def show_charging_history(data):
         print('%s %s %s' % (item['value'], item['after_adornment'],
                             item['sub_title']))
 
+def charging_history(vehicle):
+    show_charging_history(vehicle.get_charge_history())
+
+def wake_up(vehicle):
+    print('Please wait...')
+    vehicle.sync_wake_up()
+    print('-' * 80)
+
+def send_command(vehicle, name):
+    vehicle.command(name)
+
+def lock_unlock(vehicle):
+    if vehicle['vehicle_state']['locked']:
+        vehicle.command('UNLOCK')
+    else:
+        vehicle.command('LOCK')
+
+def climate_on_off(vehicle):
+    if vehicle['climate_state']['is_climate_on']:
+        vehicle.command('CLIMATE_OFF')
+    else:
+        vehicle.command('CLIMATE_ON')
+
+def set_temperature(vehicle):
+    temp = float(raw_input("Enter temperature: "))
+    vehicle.command('CHANGE_CLIMATE_TEMPERATURE_SETTING', driver_temp=temp,
+                    passenger_temp=temp)
+
+def actuate_trunk(vehicle):
+    which_trunk = raw_input("Which trunk (front/rear):")
+    vehicle.command('ACTUATE_TRUNK', which_trunk=which_trunk)
+
+def set_charge_limit(vehicle):
+    limit = int(raw_input("Enter charge limit: "))
+    vehicle.command('CHANGE_CHARGE_LIMIT', percent=limit)
+
+def open_close_charge_port(vehicle):
+    if vehicle['charge_state']['charge_port_door_open']:
+        vehicle.command('CHARGE_PORT_DOOR_CLOSE')
+    else:
+        vehicle.command('CHARGE_PORT_DOOR_OPEN')
+
+def start_stop_charge(vehicle):
+    if vehicle['charge_state']['charging_state'].lower() == 'charging':
+        vehicle.command('STOP_CHARGE')
+    else:
+        vehicle.command('START_CHARGE')
+
+def seat_heater(vehicle):
+    heater = int(raw_input("Enter heater (0=Driver,1=Passenger,"
+                           "2=Rear left,3=Rear center,4=Rear right): "))
+    level = int(raw_input("Enter level (0..3): "))
+    vehicle.command('REMOTE_SEAT_HEATER_REQUEST', heater=heater, level=level)
+
+def window_control(vehicle):
+    command = raw_input("Enter command (close/vent):")
+    vehicle.command('WINDOW_CONTROL', command=command, lat=0, lon=0)
+
+def max_defrost(vehicle):
+    try:
+        if vehicle['climate_state']['defrost_mode']:
+            vehicle.command('MAX_DEFROST', on=False)
+        else:
+            vehicle.command('MAX_DEFROST', on=True)
+    except KeyError:
+        print('Not available')
+
+def charging_amps(vehicle):
+    amps = int(raw_input("Enter charging amps: "))
+    vehicle.command('CHARGING_AMPS', charging_amps=amps)
+
+# Menu option label, function to call with vehicle and extra arguments
+MENU = (('Refresh', None, ()),
+        ('Charging history', charging_history, ()),
+        ('Wake up', wake_up, ()),
+        ('Nearby charging sites', show_charging_sites, ()),
+        ('Honk horn', send_command, ('HONK_HORN', )),
+        ('Flash lights', send_command, ('FLASH_LIGHTS', )),
+        ('Lock/unlock', lock_unlock, ()),
+        ('Climate on/off', climate_on_off, ()),
+        ('Set temperature', set_temperature, ()),
+        ('Actuate frunk/trunk', actuate_trunk, ()),
+        ('Remote start drive', send_command, ('REMOTE_START', )),
+        ('Set charge limit', set_charge_limit, ()),
+        ('Open/close charge port', open_close_charge_port, ()),
+        ('Start/stop charge', start_stop_charge, ()),
+        ('Seat heater request', seat_heater, ()),
+        ('Toggle media playback', send_command, ('MEDIA_TOGGLE_PLAYBACK', )),
+        ('Window control', window_control, ()),
+        ('Max defrost', max_defrost, ()),
+        ('Set charging amps', charging_amps, ()))
+
 def menu(vehicle):
-    lst = ['Refresh', 'Charging history', 'Wake up', 'Nearby charging sites',
-           'Honk horn', 'Flash lights', 'Lock/unlock', 'Climate on/off',
-           'Set temperature', 'Actuate frunk/trunk', 'Remote start drive',
-           'Set charge limit', 'Open/close charge port', 'Start/stop charge',
-           'Seat heater request', 'Toggle media playback', 'Window control',
-           'Max defrost', 'Set charging amps']
+    # Format 3 column menu once
+    items = ['{:2} {:23}'.format(i, item[0]) for i, item in enumerate(MENU, 1)]
+    options = '\n'.join(''.join(items[i:i + 3])
+                        for i in range(0, len(items), 3))
     opt = 0
     while True:
         if vehicle['state'] == 'online':
@@ -182,90 +347,22 @@ def menu(vehicle):
             print('Wake up vehicle to use remote functions/telemetry')
         print('-' * 80)
         # Display 3 column menu
-        for i, option in enumerate(lst, 1):
-            print('{:2} {:23}'.format(i, option), end='' if i % 3 else '\n')
-        if i % 3:
-            print()
+        print(options)
         print('-' * 80)
         # Get user choice
         opt = int(raw_input("Choice (0 to quit): "))
         print('-' * 80)
         # Check if vehicle is still online, otherwise force refresh
         if opt > 3:
-            vehicle.get_vehicle_summary()
-            if vehicle['state'] != 'online' or vehicle['in_service']:
+            if not vehicle.available() or vehicle['in_service']:
                 opt = 1
-        # Perform menu option
         if opt == 0:
             break
-        if opt == 1:
-            pass
-        elif opt == 2:
-            show_charging_history(vehicle.get_charge_history())
-        elif opt == 3:
-            print('Please wait...')
-            vehicle.sync_wake_up()
-            print('-' * 80)
-        elif opt == 4:
-            show_charging_sites(vehicle)
-        elif opt == 5:
-            vehicle.command('HONK_HORN')
-        elif opt == 6:
-            vehicle.command('FLASH_LIGHTS')
-        elif opt == 7:
-            if vehicle['vehicle_state']['locked']:
-                vehicle.command('UNLOCK')
-            else:
-                vehicle.command('LOCK')
-        elif opt == 8:
-            if vehicle['climate_state']['is_climate_on']:
-                vehicle.command('CLIMATE_OFF')
-            else:
-                vehicle.command('CLIMATE_ON')
-        elif opt == 9:
-            temp = float(raw_input("Enter temperature: "))
-            vehicle.command('CHANGE_CLIMATE_TEMPERATURE_SETTING', driver_temp=temp,
-                            passenger_temp=temp)
-        elif opt == 10:
-            which_trunk = raw_input("Which trunk (front/rear):")
-            vehicle.command('ACTUATE_TRUNK', which_trunk=which_trunk)
-        elif opt == 11:
-            vehicle.command('REMOTE_START')
-        elif opt == 12:
-            limit = int(raw_input("Enter charge limit: "))
-            vehicle.command('CHANGE_CHARGE_LIMIT', percent=limit)
-        elif opt == 13:
-            if vehicle['charge_state']['charge_port_door_open']:
-                vehicle.command('CHARGE_PORT_DOOR_CLOSE')
-            else:
-                vehicle.command('CHARGE_PORT_DOOR_OPEN')
-        elif opt == 14:
-            if vehicle['charge_state']['charging_state'].lower() == 'charging':
-                vehicle.command('STOP_CHARGE')
-            else:
-                vehicle.command('START_CHARGE')
-        elif opt == 15:
-            heater = int(raw_input("Enter heater (0=Driver,1=Passenger,"
-                                   "2=Rear left,3=Rear center,4=Rear right): "))
-            level = int(raw_input("Enter level (0..3): "))
-            vehicle.command('REMOTE_SEAT_HEATER_REQUEST', heater=heater,
-                            level=level)
-        elif opt == 16:
-            vehicle.command('MEDIA_TOGGLE_PLAYBACK')
-        elif opt == 17:
-            command = raw_input("Enter command (close/vent):")
-            vehicle.command('WINDOW_CONTROL', command=command, lat=0, lon=0)
-        elif opt == 18:
-            try:
-                if vehicle['climate_state']['defrost_mode']:
-                    vehicle.command('MAX_DEFROST', on=False)
-                else:
-                    vehicle.command('MAX_DEFROST', on=True)
-            except KeyError:
-                print('Not available')
-        elif opt == 19:
-            amps = int(raw_input("Enter charging amps: "))
-            vehicle.command('CHARGING_AMPS', charging_amps=amps)
+        # Perform menu option
+        if 0 < opt <= len(MENU):
+            func, args = MENU[opt - 1][1:]
+            if func:
+                func(vehicle, *args)
 
 def custom_auth(url):
     # Use pywebview if no web browser specified
@@ -274,7 +371,7 @@ def custom_auth(url):
         window = webview.create_window('Login', url)
         def on_loaded():
             result[0] = window.get_current_url()
-            if 'void/callback' in result[0].split('?')[0]:
+            if 'void/callback' in result[0].partition('?')[0]:
                 window.destroy()
         try:
             window.events.loaded += on_loaded
@@ -299,6 +396,7 @@ def main():
                         format=default_format)
     if not args.verify:
         # Disable SSL verify for Nominatim
+        import geopy.geocoders
         ctx = ssl.create_default_context()
         ctx.check_hostname = False
         ctx.verify_mode = ssl.CERT_NONE
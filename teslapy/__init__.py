@@ -38,6 +38,7 @@ SSO_BASE_URL = 'https://auth.tesla.com/'
 SSO_CLIENT_ID = 'ownerapi'
 STREAMING_BASE_URL = 'wss://streaming.vn.teslamotors.com/'
 APP_USER_AGENT = 'TeslaApp/4.10.0'
+TOKEN_EXPIRY_MARGIN = 60  # Seconds before expiry to refresh token
 
 # Setup module logging
 logger = logging.getLogger(__name__)
@@ -73,6 +74,8 @@ class Tesla(OAuth2Session):
     state (optional): A state string for CSRF protection.
     """
 
+    endpoints = {}  # API endpoints class variable
+
     def __init__(self, email, verify=True, proxy=None, retry=0, timeout=10,
                  user_agent=__name__ + '/' + __version__, authenticator=None,
                  cache_file='cache.json', cache_loader=None, cache_dumper=None,
@@ -87,7 +90,6 @@ class Tesla(OAuth2Session):
         self.cache_dumper = cache_dumper or self._cache_dump
         self.cache_file = cache_file
         self.timeout = timeout
-        self.endpoints = {}
         self.sso_base_url = sso_base_url or SSO_BASE_URL
         self._auto_refresh_url = None
         self.code_verifier = code_verifier
@@ -142,6 +144,11 @@ class Tesla(OAuth2Session):
         """
         if url.startswith(self.sso_base_url):
             return super(Tesla, self).request(method, url, **kwargs)
+        # Refresh token if it is about to expire, so that it does not expire
+        # while the request is in flight
+        if self.authorized and not kwargs.get('withhold_token') and \
+                0 < (self.expires_at or 0) < time.time() + TOKEN_EXPIRY_MARGIN:
+            self.refresh_token()
         # Construct URL and send request with optional serialized data
         url = urljoin(BASE_URL, url)
         kwargs.setdefault('timeout', self.timeout)
@@ -301,13 +308,15 @@ class Tesla(OAuth2Session):
         return cache
 
     def _cache_dump(self, cache):
-        """ Default cache dumper method """
+        """ Default cache dumper method, writes to a temporary file first and
+        then replaces the cache file, so it is never left partially written """
+        temp_file = self.cache_file + '.tmp'
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as outfile:
+            with open(temp_file, 'w', encoding='utf-8') as outfile:
                 json.dump(cache, outfile)
-            os.chmod(self.cache_file, (stat.S_IWUSR | stat.S_IRUSR |
-                                       stat.S_IRGRP))
-        except IOError:
+            os.chmod(temp_file, (stat.S_IWUSR | stat.S_IRUSR | stat.S_IRGRP))
+            getattr(os, 'replace', os.rename)(temp_file, self.cache_file)
+        except (IOError, OSError):
             logger.error('Cache not updated')
         else:
             logger.debug('Updated cache')
@@ -319,10 +328,12 @@ class Tesla(OAuth2Session):
         cache = self.cache_loader()
         if not isinstance(cache, dict):
             raise ValueError('`cache_loader` must return dict')
-        # Write token to cache
+        # Write token to cache, if it has changed
         if self.authorized:
-            cache[self.email] = {'url': self.sso_base_url, 'sso': self.token}
-            self.cache_dumper(cache)
+            entry = {'url': self.sso_base_url, 'sso': self.token}
+            if cache.get(self.email) != entry:
+                cache[self.email] = entry
+                self.cache_dumper(cache)
         # Read token from cache
         elif self.email in cache:
             self.sso_base_url = cache[self.email].get('url', self.sso_base_url)
@@ -330,7 +341,7 @@ class Tesla(OAuth2Session):
             if not self.token:
                 return
             # Log the token validity
-            if 0 < self.expires_at < time.time():
+            if 0 < self.expires_at < time.time() + TOKEN_EXPIRY_MARGIN:
                 logger.debug('Cached SSO token expired')
             else:
                 logger.debug('Cached SSO token expires at %s',
@@ -344,11 +355,11 @@ class Tesla(OAuth2Session):
         Return type: JsonDict or String
         """
         path_vars = path_vars or {}
-        # Load API endpoints once
+        # Load API endpoints once for all instances
         if not self.endpoints:
             try:
                 data = pkgutil.get_data(__name__, 'endpoints.json')
-                self.endpoints = json.loads(data.decode())
+                type(self).endpoints = json.loads(data.decode())
                 logger.debug('%d endpoints loaded', len(self.endpoints))
             except (IOError, ValueError):
                 logger.error('No endpoints loaded')
@@ -419,6 +430,7 @@ class Vehicle(JsonDict):
         self.tesla = tesla
         self.callback = None
         self.timestamp = time.time()
+        self._option_codes = self._vin_decoded = (None, None)
         self.orders = self.orders or self.api('VEHICLE_ORDER_LIST')['response']
 
     @property
@@ -445,7 +457,8 @@ class Vehicle(JsonDict):
                     data[key] = ast.literal_eval(value) if value else None
                 except (SyntaxError, ValueError):
                     pass
-            logger.debug('Update %s', json.dumps(data))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('Update %s', json.dumps(data))
             if self.callback:
                 self.callback(data)
             # Update polled data with streaming telemetry data
@@ -552,8 +565,11 @@ class Vehicle(JsonDict):
     def option_code_list(self):
         """ Returns a list of known vehicle option code titles """
         codes = self.order.get('mktOptions', self['option_codes'])
-        return list(filter(None, [self.decode_option(code)
-                                  for code in codes.split(',')]))
+        # Decode option codes once, unless they have changed since
+        if self._option_codes[0] != codes:
+            self._option_codes = (codes, list(filter(None, [
+                self.decode_option(code) for code in codes.split(',')])))
+        return list(self._option_codes[1])
 
     def get_vehicle_data(self, endpoints='location_data;charge_state;'
                                          'climate_state;vehicle_state;'
@@ -621,10 +637,11 @@ class Vehicle(JsonDict):
         model = self.order.get('modelCode', 'm' + self['vin'][3].lower())
         params = {'model': model, 'bkba_opt': 1, 'view': view, 'size': size,
                   'options': options}
-        # Retrieve image from compositor
+        # Retrieve image from compositor using the session's connection pool
         url = 'https://static-assets.tesla.com/v1/compositor/'
-        response = requests.get(url, params=params, verify=self.tesla.verify,
-                                proxies=self.tesla.proxies, timeout=30)
+        response = super(Tesla, self.tesla).request('GET', url, params=params,
+                                                     withhold_token=True,
+                                                     timeout=30)
         response.raise_for_status()  # Raise HTTPError, if one occurred
         return response.content
 
@@ -676,6 +693,12 @@ class Vehicle(JsonDict):
 
     def decode_vin(self):
         """ Returns decoded VIN as dict """
+        if self._vin_decoded[0] != self['vin']:
+            self._vin_decoded = (self['vin'], self._decode_vin())
+        return JsonDict(self._vin_decoded[1])
+
+    def _decode_vin(self):
+        """ Decodes VIN into dict """
         make = 'Tesla Model ' + self['vin'][3]
         body = {
             'A': 'Hatch back 5 Dr / LHD', 'B': 'Hatch back 5 Dr / RHD',